@@ -1,21 +1,97 @@
 """Buffered logging for batch ingestion to AI Trace server."""
+import atexit
+import functools
 import os
+import gzip
+import html
 import json
+import queue
+import random
 import sys
+import threading
+import time
 import structlog
-import requests
-from typing import List, Dict, Any, Optional, Literal
+from collections import deque
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, List, Dict, Deque, Any, Iterable, Iterator, Optional, Literal, Union
 from contextlib import contextmanager
+from dataclasses import is_dataclass, fields
+from decimal import Decimal
+from enum import Enum
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, date, time as dt_time, timedelta
 from uuid import UUID
 
-from .logging_config import _otel_ids_processor, _source_location_processor
-from .config import path_to_display
+from .logging_config import (
+    _compat_mode_enabled,
+    _dict_tracebacks_processor,
+    _json_renderer,
+    _make_wrap_processor,
+    _otel_ids_processor,
+    _source_location_processor,
+)
+from .config import _HOME, path_to_display
 
+if TYPE_CHECKING:
+    import requests
 
-# HTML template for trace export
-HTML_TEMPLATE = """<!DOCTYPE html>
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "fast" extra
+    orjson = None
+
+try:
+    import ormsgpack
+except ImportError:  # optional binary wire format, see the "msgpack" extra
+    ormsgpack = None
+
+# orjson natively encodes UUID, datetime, dataclasses and Enums; everything
+# else is routed through _json_serializer via the default= hook.
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+# Serialized log lines are joined into chunks of about this size so a flush
+# costs one write() per chunk instead of one per log entry.
+_WRITE_CHUNK_SIZE = 64 * 1024
+
+# Content type of HTTP batches sent with wire_format="msgpack"
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+
+# Content type of HTTP batches sent with wire_format="ndjson"
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+# HTTP payloads larger than this are gzip-compressed (level 1 keeps it cheap)
+_GZIP_MIN_BYTES = 1024
+
+# File flush staging buffer is dropped after a batch larger than this
+_WRITE_BUF_SOFT_CAP = 128 * 1024
+
+# Page cache hint after file flushes (the process never re-reads its log);
+# not available on macOS and Windows
+_FADV_DONTNEED = getattr(os, "POSIX_FADV_DONTNEED", None) if hasattr(os, "posix_fadvise") else None
+
+# A file target is checked for rotation (renamed or deleted path) at most this often
+_ROTATION_CHECK_INTERVAL_S = 1.0
+
+# Dropped entries are reported on stderr at most this often
+_DROP_REPORT_INTERVAL_S = 1.0
+
+# After a failed size-triggered flush, log calls wait this long before
+# flushing again (the interval timer keeps retrying meanwhile)
+_FLUSH_RETRY_DELAY_S = 1.0
+
+# fdatasync() where available, fsync() otherwise (e.g. macOS)
+_datasync = getattr(os, "fdatasync", os.fsync)
+
+# Batches waiting for the background writer before flush() stops queueing
+_WRITER_QUEUE_SIZE = 64
+
+# Queued batches are merged into one write (or POST) until it holds this many entries
+_WRITER_COALESCE_MAX_ENTRIES = 5000
+
+
+# HTML template for trace export, split around the log entries so the
+# document can be streamed to disk entry by entry
+HTML_HEAD = """<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
@@ -125,38 +201,99 @@ HTML_TEMPLATE = """<!DOCTYPE html>
         </div>
         
         <div class="logs">
-            {logs_html}
+"""
+
+HTML_TAIL = """
         </div>
     </div>
 </body>
 </html>
 """
 
+# HTML fragment for a single log entry, filled with %-formatting from
+# (level, level, timestamp, event, trace_id, span_id, parent_span_id, details)
+_ENTRY_TEMPLATE = """
+            <div class="log-entry">
+                <div class="log-header">
+                    <span class="log-level %s">%s</span>
+                    <span class="log-timestamp">%s</span>
+                </div>
+                <div class="log-event">%s</div>
+                <div class="trace-info">
+                    <div class="trace-field">
+                        <div class="trace-label">Trace ID:</div>
+                        <div class="trace-value">%s</div>
+                    </div>
+                    <div class="trace-field">
+                        <div class="trace-label">Span ID:</div>
+                        <div class="trace-value">%s</div>
+                    </div>
+                    <div class="trace-field">
+                        <div class="trace-label">Parent Span:</div>
+                        <div class="trace-value">%s</div>
+                    </div>
+                </div>
+                <div class="log-details">%s</div>
+            </div>
+            """
 
-def _json_serializer(obj):
-    """Advanced JSON serializer for complex objects.
+# Target prefixes and placeholders recognised by BufferedLogger._parse_target
+_HTTP_PREFIXES = ("http://", "https://")
+_TIMESTAMP_PLACEHOLDER = "<YYYYMMDD_HHMMSS>"
+
+# __tracer_meta__ values shared by many buffered entries (see _make_buffering_processor)
+_SHARED_META_KEYS = ("trace_id", "span_id", "parent_span_id", "file", "function")
+
+# Keys left out of the per-entry details block (shown in the header instead)
+_DETAILS_EXCLUDED_KEYS = frozenset(("__tracer_meta__", "timestamp"))
+
+
+def _decode_bytes(value: bytes) -> str:
+    """Decode bytes as UTF-8, falling back to hex for binary data."""
+    try:
+        return value.decode('utf-8')
+    except UnicodeDecodeError:
+        return value.hex()
+
+
+# Fast path for the common exotic types, looked up by exact type
+_SERIALIZERS = {
+    UUID: str,
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+    dt_time: dt_time.isoformat,
+    timedelta: timedelta.total_seconds,
+    Decimal: float,
+    set: list,
+    frozenset: list,
+    bytes: _decode_bytes,
+}
+
+
+# Values the JSON encoders handle natively
+_JSON_PRIMITIVES = (str, int, float, bool, type(None))
+
+# Returned by _serialize_scalar for values it does not convert
+_UNHANDLED = object()
+
+
+def _serialize_scalar(obj):
+    """Convert a leaf value (UUID, datetime, Decimal, ...) to a JSON type.
     
-    Handles:
-    - UUID objects (converted to strings)
-    - datetime objects (ISO format)
-    - Objects with __dict__ (converted to dict)
-    - dataclasses
-    - Enums
-    - Sets, frozensets (converted to lists)
-    - bytes (decoded or hex)
-    - Other iterables
+    Exact matches in _SERIALIZERS are handled with a single dict lookup;
+    subclasses go through the isinstance checks. Returns _UNHANDLED for
+    anything that is not a known leaf type.
     """
-    from datetime import datetime, date, time, timedelta
-    from decimal import Decimal
-    from enum import Enum
-    from dataclasses import is_dataclass, asdict
+    serializer = _SERIALIZERS.get(type(obj))
+    if serializer is not None:
+        return serializer(obj)
     
     # Handle UUIDs
     if isinstance(obj, UUID):
         return str(obj)
     
     # Handle datetime objects
-    if isinstance(obj, (datetime, date, time)):
+    if isinstance(obj, (datetime, date, dt_time)):
         return obj.isoformat()
     
     if isinstance(obj, timedelta):
@@ -176,48 +313,267 @@ def _json_serializer(obj):
     
     # Handle bytes
     if isinstance(obj, bytes):
-        try:
-            return obj.decode('utf-8')
-        except UnicodeDecodeError:
-            return obj.hex()
+        return _decode_bytes(obj)
     
-    # Handle dataclasses
+    return _UNHANDLED
+
+
+def _public_attrs(obj) -> Optional[Dict[str, Any]]:
+    """Return the public attributes of a dataclass or plain object, or None."""
     if is_dataclass(obj) and not isinstance(obj, type):
-        try:
-            return asdict(obj)
-        except Exception:
-            pass
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    try:
+        attrs = vars(obj)
+    except TypeError:
+        return None
+    # Skip private attributes
+    result = {key: value for key, value in attrs.items() if not key.startswith('_')}
+    if not result:
+        return None
+    result['__type__'] = type(obj).__name__
+    return result
+
+
+def _serialize_value(obj):
+    """Convert a nested object graph into JSON-compatible data.
     
-    # Handle objects with __dict__
-    if hasattr(obj, '__dict__'):
-        try:
+    Walks dicts, lists, tuples, sets, dataclasses, objects with __dict__ and
+    other iterables using an explicit work stack of (container, key, value)
+    triples instead of recursion, so deep nesting cannot raise
+    RecursionError. A reference back to an object that is still being
+    walked is replaced with a "<circular: TypeName>" marker.
+    
+    Args:
+        obj: Object to convert
+        
+    Returns:
+        JSON-compatible representation of obj
+    """
+    root: List[Any] = [None]
+    stack: List[tuple] = [(root, 0, obj)]
+    # ids of the containers on the current path; a (None, None, id) triple
+    # marks the point where a container's children are done
+    active = set()
+    
+    while stack:
+        container, key, value = stack.pop()
+        if container is None:
+            active.discard(value)
+            continue
+        
+        if isinstance(value, _JSON_PRIMITIVES):
+            container[key] = value
+            continue
+        
+        value_id = id(value)
+        if value_id in active:
+            container[key] = f"<circular: {type(value).__name__}>"
+            continue
+        
+        if isinstance(value, dict):
+            children = value.items()
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            children = None
+        else:
+            converted = _serialize_scalar(value)
+            if converted is not _UNHANDLED:
+                container[key] = converted
+                continue
+            attrs = _public_attrs(value)
+            items = None
+            if attrs is None and hasattr(value, '__iter__'):
+                try:
+                    items = list(value)
+                except Exception:
+                    pass
+            if attrs is not None:
+                children = attrs.items()
+            elif items is not None:
+                children, value = None, items
+            else:
+                # Fallback to string representation
+                try:
+                    container[key] = str(value)
+                except Exception:
+                    container[key] = f"<non-serializable: {type(value).__name__}>"
+                continue
+        
+        active.add(value_id)
+        stack.append((None, None, value_id))
+        if children is not None:
             result = {}
-            for key, value in obj.__dict__.items():
-                if not key.startswith('_'):  # Skip private attributes
-                    try:
-                        # Recursively serialize nested objects
-                        result[key] = _json_serializer(value) if not isinstance(value, (str, int, float, bool, type(None))) else value
-                    except Exception:
-                        result[key] = str(value)
-            if result:
-                result['__type__'] = type(obj).__name__
-                return result
-        except Exception:
-            pass
+            container[key] = result
+            # Pushed in reverse so keys come out in their original order
+            for child_key, child in reversed(list(children)):
+                stack.append((result, child_key, child))
+        else:
+            result = [None] * len(value)
+            container[key] = result
+            for index, child in enumerate(value):
+                stack.append((result, index, child))
+    
+    return root[0]
+
+
+def _json_serializer(obj):
+    """Advanced JSON serializer for complex objects.
     
-    # Handle iterables (but not strings)
-    if hasattr(obj, '__iter__') and not isinstance(obj, (str, bytes)):
+    Handles:
+    - UUID objects (converted to strings)
+    - datetime objects (ISO format)
+    - Objects with __dict__ (converted to dict)
+    - dataclasses
+    - Enums
+    - Sets, frozensets (converted to lists)
+    - bytes (decoded or hex)
+    - Other iterables
+    
+    Leaf types are converted by _serialize_scalar; containers and objects
+    are walked by _serialize_value.
+    """
+    converted = _serialize_scalar(obj)
+    if converted is not _UNHANDLED:
+        return converted
+    return _serialize_value(obj)
+
+
+def _dumps(obj: Any, *, indent: bool = False, newline: bool = False) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes.
+    
+    Uses orjson when installed and falls back to the stdlib json module
+    otherwise (or for values orjson rejects, e.g. integers above 64 bits).
+    
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with 2-space indentation
+        newline: Append a trailing newline (JSON lines output)
+    """
+    if orjson is not None:
+        option = _ORJSON_OPTIONS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if newline:
+            option |= orjson.OPT_APPEND_NEWLINE
         try:
-            return [_json_serializer(item) if not isinstance(item, (str, int, float, bool, type(None))) else item 
-                    for item in obj]
-        except Exception:
+            return orjson.dumps(obj, default=_json_serializer, option=option)
+        except TypeError:
             pass
     
-    # Fallback to string representation
+    data = json.dumps(obj, default=_json_serializer, indent=2 if indent else None)
+    if newline:
+        data += "\n"
+    return data.encode("utf-8")
+
+
+def _packb(obj: Any) -> Optional[bytes]:
+    """Serialize obj to MessagePack bytes, or None if ormsgpack rejects it.
+    
+    ormsgpack encodes UUID, datetime, dataclasses and Enums natively; other
+    types go through _json_serializer. Values MessagePack cannot represent
+    (e.g. integers wider than 64 bits) make the caller fall back to JSON.
+    """
     try:
-        return str(obj)
-    except Exception:
-        return f"<non-serializable: {type(obj).__name__}>"
+        return ormsgpack.packb(obj, default=_json_serializer, option=ormsgpack.OPT_NON_STR_KEYS)
+    except TypeError:
+        return None
+
+
+# Formatted wall-clock timestamps, recomputed at most once per second
+_now_cache: Dict[str, tuple[int, str]] = {}
+
+
+def _now_compact() -> str:
+    """Current local time as YYYYMMDD_HHMMSS (used in file names)."""
+    second = int(time.time())
+    cached = _now_cache.get("compact")
+    if cached is None or cached[0] != second:
+        cached = (second, datetime.fromtimestamp(second).strftime("%Y%m%d_%H%M%S"))
+        _now_cache["compact"] = cached
+    return cached[1]
+
+
+def _now_display() -> str:
+    """Current local time as YYYY-MM-DD HH:MM:SS (used in HTML exports)."""
+    second = int(time.time())
+    cached = _now_cache.get("display")
+    if cached is None or cached[0] != second:
+        # Whole seconds, so isoformat() yields exactly this layout without strftime
+        cached = (second, datetime.fromtimestamp(second).isoformat(sep=" "))
+        _now_cache["display"] = cached
+    return cached[1]
+
+
+def _iter_chunks(lines: Iterable[bytes]) -> Iterator[bytes]:
+    """Join serialized lines into chunks of roughly _WRITE_CHUNK_SIZE bytes."""
+    chunk: List[bytes] = []
+    size = 0
+    for line in lines:
+        chunk.append(line)
+        size += len(line)
+        if size >= _WRITE_CHUNK_SIZE:
+            yield b"".join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield b"".join(chunk)
+
+
+def _write_all(write, data: bytes) -> None:
+    """Write data with an unbuffered write callable, retrying partial writes."""
+    view = memoryview(data)
+    while view:
+        written = write(view)
+        view = view[written:]
+
+
+def _stdout_fd() -> Optional[int]:
+    """File descriptor behind sys.stdout, or None if it has none (e.g. StringIO)."""
+    try:
+        return sys.stdout.fileno()
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+class _BufferView(Sequence):
+    """Read-only, live view of a BufferedLogger buffer.
+    
+    Reflects entries logged or flushed after it was created - including
+    the automatic flushes of the interval timer, which empty it without
+    any thread of the caller's doing. Iteration and indexing take the
+    buffer lock, so they never see the deque mid-update; iterating walks a
+    snapshot taken when iteration starts.
+    """
+    
+    __slots__ = ("_d", "_lock")
+    
+    def __init__(self, buffer: Deque[Dict[str, Any]], lock: threading.Lock):
+        self._d = buffer
+        self._lock = lock
+    
+    def __len__(self) -> int:
+        return len(self._d)
+    
+    def __getitem__(self, index):
+        with self._lock:
+            if isinstance(index, slice):
+                return [self._d[i] for i in range(*index.indices(len(self._d)))]
+            return self._d[index]
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            return iter(list(self._d))
+    
+    def __repr__(self) -> str:
+        return f"<BufferView of {len(self._d)} entries>"
+
+
+@functools.lru_cache(maxsize=64)
+def _resolve_target_template(target: str, cwd: str) -> str:
+    """Expand ~ and make a file target absolute, keeping any placeholder.
+    
+    `cwd` only keys the cache, since relative targets resolve against it.
+    """
+    return str(Path(target).expanduser().resolve())
 
 
 class BufferedLogger:
@@ -232,15 +588,56 @@ class BufferedLogger:
     - HTTP URL: "http://localhost:8000/api/ingest" or "https://..."
     - File: Any path like "~/tmp/my-app/logs.jsonl" (supports ~ expansion)
     - Stdout: "-" (dash) or None (fallback)
+    
+    The buffer is a ring of at most `capacity` entries; when it is full the
+    oldest entry is dropped (or, with `overflow="drop_newest"`, the new one)
+    to keep memory bounded between flushes. Drops are reported on stderr at
+    most once per second; `stats()` returns the running counters.
+    
+    Besides explicit `flush()` calls, the buffer is flushed automatically once
+    it holds `max_batch` entries or `max_interval_ms` after the first entry
+    was buffered (AITRACE_BATCH_SIZE / AITRACE_BATCH_MS, 0 disables either).
+    
+    HTTP batches are sent by background threads (AITRACE_HTTP_CONCURRENCY
+    requests in flight, default 1); with `background=True` file and stdout
+    batches are written by a background thread as well. Call `close()` (or use
+    the logger as a context manager), or `flush(sync=True)`, to wait for them.
     """
     
-    def __init__(self, target: Optional[str] = None):
+    def __init__(
+        self,
+        target: Optional[str] = None,
+        capacity: Optional[int] = None,
+        overflow: Optional[Literal["drop_oldest", "drop_newest"]] = None,
+        max_batch: Optional[int] = None,
+        max_interval_ms: Optional[int] = None,
+        wire_format: Literal["json", "ndjson", "msgpack"] = "json",
+        background: Optional[bool] = None,
+    ):
         """Initialize buffered logger.
         
         Args:
             target: Output target (URL, file path, or "-" for stdout).
                    If not provided, reads from LOG_TRG environment variable.
                    Falls back to stdout if neither is set.
+            capacity: Maximum number of buffered entries.
+                   Defaults to AITRACE_BUFFER_CAP or 10000.
+            overflow: What to drop when the buffer is full: "drop_oldest"
+                   (default) or "drop_newest". Defaults to AITRACE_BUFFER_OVERFLOW.
+            max_batch: Auto-flush once this many entries are buffered.
+                   Defaults to AITRACE_BATCH_SIZE or 500; 0 disables.
+            max_interval_ms: Auto-flush this long after the first buffered entry.
+                   Defaults to AITRACE_BATCH_MS or 200; 0 disables.
+            wire_format: Encoding of HTTP batches. "json" (default) sends a
+                   single JSON array, which every server version accepts.
+                   "ndjson" sends one JSON object per line, which the server
+                   ingests while streaming (needs a server with the NDJSON
+                   endpoint). "msgpack" sends MessagePack (requires the
+                   "msgpack" extra, otherwise JSON is sent).
+            background: Write file/stdout batches on the background writer
+                   thread instead of in flush(). Defaults to
+                   AITRACE_BACKGROUND_WRITES (off); HTTP always sends in the
+                   background.
         """
         # Determine target from parameter or environment variable
         if target is None:
@@ -248,7 +645,82 @@ class BufferedLogger:
         
         # Parse and set up target
         self.target_type, self.target_value = self._parse_target(target)
-        self.buffer: List[Dict[str, Any]] = []
+        if capacity is None:
+            capacity = int(os.environ.get("AITRACE_BUFFER_CAP", 10_000))
+        if overflow is None:
+            overflow = os.environ.get("AITRACE_BUFFER_OVERFLOW", "drop_oldest")
+        if overflow not in ("drop_oldest", "drop_newest"):
+            raise ValueError(f"Unsupported overflow policy: {overflow!r}")
+        self.buffer: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self.overflow = overflow
+        
+        # Entries accepted into / discarded from the buffer since creation,
+        # and HTTP send attempts repeated after connection errors
+        self.writes_total = 0
+        self.drops_total = 0
+        self.retries_total = 0
+        self._drops_reported = 0
+        self._drops_reported_at = 0.0
+        self._flush_retry_at = 0.0
+        
+        # Auto-flush thresholds
+        if max_batch is None:
+            max_batch = int(os.environ.get("AITRACE_BATCH_SIZE", 500))
+        if max_interval_ms is None:
+            max_interval_ms = int(os.environ.get("AITRACE_BATCH_MS", 200))
+        self.max_batch = max_batch
+        self.max_interval_ms = max_interval_ms
+        
+        # HTTP retry policy for connection errors (exponential backoff + jitter)
+        self.http_retries = int(os.environ.get("AITRACE_HTTP_RETRIES", 3))
+        self.http_backoff_ms = int(os.environ.get("AITRACE_HTTP_BACKOFF_MS", 100))
+        self.http_backoff_max_ms = int(os.environ.get("AITRACE_HTTP_BACKOFF_MAX_MS", 2000))
+        
+        # HTTP sender threads, i.e. POSTs that may be in flight at once
+        self.http_concurrency = max(1, int(os.environ.get("AITRACE_HTTP_CONCURRENCY", 1)))
+        
+        # Guards the buffer and the flush timer (the timer flushes from its own thread)
+        self._lock = threading.Lock()
+        # Held by a flush from its snapshot through the write, so concurrent
+        # flushes (timer and caller) write their batches in buffer order
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        
+        if wire_format not in ("json", "ndjson", "msgpack"):
+            raise ValueError(f"Unsupported wire_format: {wire_format!r}")
+        if wire_format == "msgpack" and ormsgpack is None:
+            wire_format = "json"
+        self.wire_format = wire_format
+        
+        # Keep-alive session reused by every HTTP flush
+        self._session: Optional["requests.Session"] = None
+        if self.target_type == "http":
+            # requests (and urllib3) are only loaded for HTTP targets
+            import requests
+            from requests.adapters import HTTPAdapter
+            
+            self._session = requests.Session()
+            self._session.mount(
+                self.target_value,
+                HTTPAdapter(pool_connections=1, pool_maxsize=max(4, self.http_concurrency)),
+            )
+        
+        # File target handle and staging buffer, reused across flushes
+        self.file_fsync = os.environ.get("AITRACE_FILE_FSYNC", "0").lower() in ("1", "true", "yes")
+        self._file = None
+        self._file_id: Optional[tuple] = None
+        self._file_checked_at = 0.0
+        self._write_buf = bytearray()
+        self._write_lock = threading.Lock()
+        
+        # Background writer, started on the first flush that hands it a batch
+        if background is None:
+            background = os.environ.get("AITRACE_BACKGROUND_WRITES", "0").lower() in ("1", "true", "yes")
+        self.background = background or self.target_type == "http"
+        self._queue: Optional[queue.Queue] = None
+        self._workers: List[threading.Thread] = []
+        self._atexit_registered = False
+        
         self._configure_structlog()
         self.logger = structlog.get_logger()
     
@@ -269,16 +741,15 @@ class BufferedLogger:
             return ("stdout", None)
         
         # HTTP target
-        if target.startswith("http://") or target.startswith("https://"):
+        if target.startswith(_HTTP_PREFIXES):
             return ("http", target)
         
-        # File target - expand ~ and create timestamp
-        # Replace timestamp placeholders if present
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        expanded = target.replace("<YYYYMMDD_HHMMSS>", timestamp)
-        
-        # Expand ~ to user's home directory and resolve to absolute path
-        file_path = Path(expanded).expanduser().resolve()
+        # File target - expand ~ and resolve to an absolute path (cached per
+        # template), then replace the timestamp placeholder if present
+        resolved = _resolve_target_template(target, os.getcwd())
+        if _TIMESTAMP_PLACEHOLDER in resolved:
+            resolved = resolved.replace(_TIMESTAMP_PLACEHOLDER, _now_compact())
+        file_path = Path(resolved)
         
         # Create parent directories if they don't exist
         file_path.parent.mkdir(parents=True, exist_ok=True)
@@ -291,56 +762,162 @@ class BufferedLogger:
         For HTTP and file targets, logs are only buffered (not printed).
         For stdout target, logs are buffered AND printed.
         """
-        from .logging_config import _wrap_tracer_metadata_processor
-        
         processors = [
             structlog.contextvars.merge_contextvars,
             structlog.processors.TimeStamper(fmt="iso"),
             _source_location_processor,  # Add source file and line info
             _otel_ids_processor,  # Add trace/span IDs
-            structlog.processors.dict_tracebacks,
-            _wrap_tracer_metadata_processor,  # Wrap metadata into __tracer_meta__
-            self._buffering_processor,
+            _dict_tracebacks_processor,
+            _make_wrap_processor(_compat_mode_enabled()),  # Wrap metadata into __tracer_meta__
+            self._make_buffering_processor(),
         ]
         
         # Only add JSONRenderer for stdout target (immediate output)
         # For http/file targets, logs are buffered only (no printing)
         if self.target_type == "stdout":
-            processors.append(structlog.processors.JSONRenderer())
+            processors.append(_json_renderer)
         
         structlog.configure(
             processors=processors,
             cache_logger_on_first_use=False,
         )
     
-    def _buffering_processor(self, logger, name, event_dict):
-        """Processor that captures logs to buffer.
+    def _make_buffering_processor(self):
+        """Build the processor that captures logs to the buffer.
+        
+        For non-stdout targets, the processor also prevents logs from being
+        printed by raising DropEvent after buffering.
         
-        For non-stdout targets, this also prevents logs from being printed
-        by raising DropEvent after buffering.
+        It triggers an automatic flush when the batch size is reached, and
+        arms the interval timer for the first entry buffered after a flush.
+        The target and overflow policy are fixed when the logger is created,
+        so they are resolved here instead of on every log call.
         """
-        self.buffer.append(event_dict)
+        buffer = self.buffer
+        lock = self._lock
+        intern = sys.intern
+        drop_newest = self.overflow == "drop_newest"
+        drop_event = self.target_type != "stdout"
         
-        # For http/file targets, drop the event to prevent printing
-        # For stdout, return event_dict to continue processing
-        if self.target_type != "stdout":
-            raise structlog.DropEvent
+        def _buffering_processor(logger, name, event_dict):
+            # Buffered entries of one span repeat the same ID and source strings;
+            # intern them so the buffer holds one copy of each instead of one per entry
+            meta = event_dict.get("__tracer_meta__")
+            if meta is not None:
+                for key in _SHARED_META_KEYS:
+                    value = meta.get(key)
+                    if type(value) is str:
+                        meta[key] = intern(value)
+            
+            with lock:
+                # A full deque drops its oldest entry on append; drop_newest keeps it instead
+                full = len(buffer) == buffer.maxlen
+                if full:
+                    self.drops_total += 1
+                    self._report_drops()
+                if not (full and drop_newest):
+                    buffer.append(event_dict)
+                    self.writes_total += 1
+                pending = len(buffer)
+                if self.max_interval_ms and self._timer is None:
+                    self._timer = threading.Timer(self.max_interval_ms / 1000, self._flush_on_timer)
+                    self._timer.daemon = True
+                    self._timer.start()
+            
+            if self.max_batch and pending >= self.max_batch and time.monotonic() >= self._flush_retry_at:
+                try:
+                    self.flush()
+                except Exception as e:
+                    # Don't let a failing target break (or slow down) log calls
+                    self._flush_retry_at = time.monotonic() + _FLUSH_RETRY_DELAY_S
+                    print(f"⚠️  Automatic flush failed: {e}", file=sys.stderr)
+            
+            # For http/file targets, drop the event to prevent printing
+            # For stdout, return event_dict to continue processing
+            if drop_event:
+                raise structlog.DropEvent
+            
+            return event_dict
         
-        return event_dict
+        return _buffering_processor
+    
+    def _flush_on_timer(self):
+        """Timer callback: flush whatever has been buffered since the last flush."""
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except Exception as e:
+            # Nobody is waiting on the timer thread - report and keep the entries
+            print(f"⚠️  Automatic flush failed: {e}", file=sys.stderr)
+    
+    def _cancel_timer(self):
+        """Cancel a pending interval flush (caller holds the lock)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
     
     def clear(self):
         """Clear the log buffer."""
-        self.buffer.clear()
+        with self._lock:
+            self._cancel_timer()
+            self.buffer.clear()
+    
+    def _report_drops(self):
+        """Print the drops since the last report, at most once per interval (caller holds the lock)."""
+        now = time.monotonic()
+        if now - self._drops_reported_at < _DROP_REPORT_INTERVAL_S:
+            return
+        dropped = self.drops_total - self._drops_reported
+        self._drops_reported = self.drops_total
+        self._drops_reported_at = now
+        print(
+            f"⚠️  Log buffer full ({self.buffer.maxlen} entries): dropped {dropped} "
+            f"({self.overflow}, {self.drops_total} in total)",
+            file=sys.stderr,
+        )
     
-    def get_logs(self) -> List[Dict[str, Any]]:
-        """Get all buffered logs."""
-        return self.buffer.copy()
+    def stats(self) -> Dict[str, int]:
+        """Return the logger's running counters.
+        
+        Returns:
+            Dict with "writes" (entries buffered), "drops" (entries discarded
+            because the buffer was full), "retries" (repeated HTTP attempts)
+            and "buffered" (entries currently waiting for a flush)
+        """
+        with self._lock:
+            return {
+                "writes": self.writes_total,
+                "drops": self.drops_total,
+                "retries": self.retries_total,
+                "buffered": len(self.buffer),
+            }
     
-    def flush(self, clear_after: bool = True) -> Dict[str, Any]:
+    def get_logs(self, copy: bool = True) -> Union[List[Dict[str, Any]], Sequence]:
+        """Get all buffered logs.
+        
+        Args:
+            copy: Return a list snapshot (default). With copy=False a live
+                  read-only view is returned instead; it makes no copy, but
+                  is emptied by every flush, including the automatic ones
+                  the interval timer runs in the background
+            
+        Returns:
+            New list of the buffered entries, or a read-only sequence backed
+            by the buffer when copy=False
+        """
+        if not copy:
+            return _BufferView(self.buffer, self._lock)
+        with self._lock:
+            return list(self.buffer)
+    
+    def flush(self, clear_after: bool = True, sync: bool = False) -> Dict[str, Any]:
         """Send buffered logs to configured target.
         
         Args:
             clear_after: Whether to clear buffer after sending
+            sync: Wait until the background writer has written every queued
+                  batch, including this one
             
         Returns:
             Response data with at least {"ingested": count} field
@@ -349,175 +926,465 @@ class BufferedLogger:
             requests.exceptions.RequestException: If HTTP target fails
             IOError: If file write fails
         """
-        if not self.buffer:
-            return {"ingested": 0, "message": "No logs to send"}
+        with self._flush_lock:
+            # Take a snapshot so logging can continue while the batch is sent
+            with self._lock:
+                self._cancel_timer()
+                entries = list(self.buffer)
+                if clear_after:
+                    self.buffer.clear()
+            
+            if not entries:
+                result = {"ingested": 0, "message": "No logs to send"}
+            else:
+                # Route to appropriate handler based on target type
+                try:
+                    if self.target_type == "http":
+                        result = self._flush_http(entries)
+                    elif self.background and self._enqueue(entries):
+                        result = {"ingested": len(entries), "target": self.target_type, "queued": True}
+                    else:
+                        result = self._write_batch(entries)
+                except Exception:
+                    if clear_after:
+                        with self._lock:
+                            self._requeue(entries)
+                    raise
+        if sync:
+            self._wait_for_writer()
+        return result
+    
+    def _requeue(self, entries: List[Dict[str, Any]]):
+        """Put a failed batch back in front of anything logged meanwhile (caller holds the lock).
         
-        # Route to appropriate handler based on target type
+        If the batch and the newer entries don't fit together, the overflow
+        policy decides what goes: drop_oldest gives up the start of the
+        batch, drop_newest the entries logged since the snapshot. Either
+        way the loss is counted as drops.
+        """
+        buffer = self.buffer
+        excess = len(entries) + len(buffer) - buffer.maxlen
+        if excess > 0:
+            if self.overflow == "drop_newest":
+                for _ in range(excess):
+                    buffer.pop()
+            else:
+                entries = entries[excess:]
+            self.drops_total += excess
+            self._report_drops()
+        buffer.extendleft(reversed(entries))
+    
+    def _write_batch(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Write one batch to the target on the calling thread."""
         if self.target_type == "http":
-            result = self._flush_http()
+            return self._send_http(entries)
         elif self.target_type == "file":
-            result = self._flush_file()
+            return self._flush_file(entries)
         else:  # stdout
-            result = self._flush_stdout()
+            return self._flush_stdout(entries)
+    
+    def _flush_http(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Flush logs to HTTP endpoint.
         
-        if clear_after:
-            self.clear()
+        The batch is handed to a background sender thread, so the caller
+        does not wait for serialization or the request round trip.
+        If the send queue is full, or the connection fails in the sender,
+        traces are saved to a temporary HTML file in ~/tmp/temp-trace/
+        """
+        if not self._enqueue(entries):
+            # Sender is falling behind - don't block the caller
+            return self._fallback_http(entries, "send queue is full")
         
-        return result
+        return {
+            "ingested": len(entries),
+            "target": "http",
+            "queued": True
+        }
     
-    def _flush_http(self) -> Dict[str, Any]:
-        """Flush logs to HTTP endpoint.
+    def _enqueue(self, entries: List[Dict[str, Any]]) -> bool:
+        """Hand a batch to the background writer; False if its queue is full."""
+        with self._lock:
+            if not self._workers:
+                # Concurrent writers would interleave file/stdout batches
+                count = self.http_concurrency if self.target_type == "http" else 1
+                self._queue = queue.Queue(maxsize=_WRITER_QUEUE_SIZE)
+                for _ in range(count):
+                    worker = threading.Thread(
+                        target=self._writer_loop, args=(self._queue,),
+                        name="aitrace-writer", daemon=True
+                    )
+                    worker.start()
+                    self._workers.append(worker)
+                if not self._atexit_registered:
+                    atexit.register(self.close)
+                    self._atexit_registered = True
+            send_queue = self._queue
+        try:
+            send_queue.put_nowait(entries)
+        except queue.Full:
+            return False
+        return True
+    
+    def _wait_for_writer(self):
+        """Block until the background writer has handled every queued batch."""
+        send_queue = self._queue
+        if send_queue is not None:
+            send_queue.join()
+    
+    def _writer_loop(self, send_queue: "queue.Queue"):
+        """Writer loop: write queued batches until the None sentinel arrives.
+        
+        Batches that queued up while a write or request was in flight are
+        merged into one of up to _WRITER_COALESCE_MAX_ENTRIES entries.
+        """
+        stop = False
+        while not stop:
+            entries = send_queue.get()
+            taken = 1
+            if entries is None:
+                send_queue.task_done()
+                return
+            while len(entries) < _WRITER_COALESCE_MAX_ENTRIES:
+                try:
+                    more = send_queue.get_nowait()
+                except queue.Empty:
+                    break
+                taken += 1
+                if more is None:
+                    stop = True
+                    break
+                entries = entries + more
+            try:
+                self._write_batch(entries)
+            except Exception as e:
+                print(f"⚠️  Writing traces failed: {e}", file=sys.stderr)
+            finally:
+                for _ in range(taken):
+                    send_queue.task_done()
+    
+    def _encode_http(self, entries: List[Dict[str, Any]]) -> tuple[bytes, Dict[str, str]]:
+        """Serialize a batch for POSTing, returning the body and its headers."""
+        data = _packb(entries) if self.wire_format == "msgpack" else None
+        if data is not None:
+            headers = {"Content-Type": MSGPACK_CONTENT_TYPE}
+        elif self.wire_format == "ndjson":
+            data = b"".join([_dumps(entry, newline=True) for entry in entries])
+            headers = {"Content-Type": NDJSON_CONTENT_TYPE}
+        else:
+            data = _dumps(entries)
+            headers = {"Content-Type": "application/json"}
+        if len(data) > _GZIP_MIN_BYTES:
+            data = gzip.compress(data, compresslevel=1)
+            headers["Content-Encoding"] = "gzip"
+        return data, headers
+    
+    def _send_http(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Serialize and POST one batch, falling back to HTML on failure.
         
-        If connection fails, automatically falls back to saving traces
-        to a temporary HTML file in ~/tmp/temp-trace/
+        Connection errors are retried up to `http_retries` times with
+        exponential backoff and jitter; other errors (e.g. HTTP 4xx/5xx)
+        fall back immediately.
         """
-        # Serialize with custom handler for UUID and other types
-        json_data = json.dumps(self.buffer, default=_json_serializer)
+        import requests
+        
+        data, headers = self._encode_http(entries)
+        attempt = 0
+        while True:
+            try:
+                response = self._session.post(
+                    self.target_value,
+                    data=data,
+                    headers=headers,
+                    timeout=5
+                )
+                response.raise_for_status()
+                return response.json()
+            except requests.exceptions.ConnectionError as e:
+                if attempt >= self.http_retries:
+                    # Server unreachable - fallback to HTML export
+                    return self._fallback_http(entries, e)
+                delay = min(self.http_backoff_max_ms, self.http_backoff_ms * 2 ** attempt)
+                time.sleep((delay + random.random() * self.http_backoff_ms) / 1000)
+                attempt += 1
+                with self._lock:
+                    self.retries_total += 1
+            except requests.exceptions.RequestException as e:
+                return self._fallback_http(entries, e)
+    
+    def _fallback_http(self, entries: List[Dict[str, Any]], error: Any) -> Dict[str, Any]:
+        """Save entries as HTML after a failed HTTP send and report it."""
+        fallback_path = self._export_to_html_fallback(entries)
+        
+        # Print user-friendly error message
+        print(f"\n⚠️  Cannot connect to trace server at {self.target_value}", file=sys.stderr)
+        print(f"    Error: {str(error)}", file=sys.stderr)
+        print(f"\n✓  Trace saved to local file instead:", file=sys.stderr)
+        print(f"    {path_to_display(fallback_path)}", file=sys.stderr)
+        print(f"\n    Open in browser: file://{fallback_path.resolve()}\n", file=sys.stderr)
         
+        return {
+            "ingested": len(entries),
+            "target": "fallback_html",
+            "path": str(fallback_path),
+            "error": str(error)
+        }
+    
+    def close(self, timeout: float = 5.0):
+        """Flush remaining logs, wait for queued batches and close the file.
+        
+        Called automatically at interpreter exit once batches have been
+        queued. The logger can still be used afterwards; the writer threads
+        are restarted (and the file reopened) on the next flush.
+        
+        Args:
+            timeout: Seconds to wait for the writer threads to drain the queue
+        """
         try:
-            response = requests.post(
-                self.target_value,
-                data=json_data,
-                headers={"Content-Type": "application/json"},
-                timeout=5
-            )
-            response.raise_for_status()
-            return response.json()
-        except (requests.exceptions.ConnectionError, 
-                requests.exceptions.Timeout,
-                requests.exceptions.RequestException) as e:
-            # Server unreachable - fallback to HTML export
-            fallback_path = self._export_to_html_fallback()
-            
-            # Print user-friendly error message
-            print(f"\n⚠️  Cannot connect to trace server at {self.target_value}", file=sys.stderr)
-            print(f"    Error: {str(e)}", file=sys.stderr)
-            print(f"\n✓  Trace saved to local file instead:", file=sys.stderr)
-            print(f"    {path_to_display(fallback_path)}", file=sys.stderr)
-            print(f"\n    Open in browser: file://{fallback_path.resolve()}\n", file=sys.stderr)
-            
-            return {
-                "ingested": len(self.buffer),
-                "target": "fallback_html",
-                "path": str(fallback_path),
-                "error": str(e)
-            }
+            self.flush()
+        finally:
+            with self._lock:
+                self._cancel_timer()
+                workers, send_queue = self._workers, self._queue
+                self._workers, self._queue = [], None
+                registered, self._atexit_registered = self._atexit_registered, False
+            if registered:
+                # Registered again if the logger queues more batches
+                atexit.unregister(self.close)
+            # One sentinel per writer thread; each stops after taking one
+            deadline = time.monotonic() + timeout
+            for _ in workers:
+                try:
+                    send_queue.put(None, timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Full:
+                    break
+            for worker in workers:
+                worker.join(max(0.0, deadline - time.monotonic()))
+            self._close_file()
     
-    def _export_to_html_fallback(self) -> Path:
-        """Export buffered logs to an HTML file in ~/tmp/temp-trace/.
+    def __del__(self):
+        # Release the file descriptor of a logger that was never closed
+        f = getattr(self, "_file", None)
+        if f is not None:
+            f.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def _export_to_html_fallback(self, entries: List[Dict[str, Any]]) -> Path:
+        """Export log entries to an HTML file in ~/tmp/temp-trace/.
+        
+        Args:
+            entries: Log entries to export
         
         Returns:
             Path to the created HTML file
         """
         # Create fallback directory
-        fallback_dir = Path.home() / "tmp" / "temp-trace"
+        fallback_dir = _HOME / "tmp" / "temp-trace"
         fallback_dir.mkdir(parents=True, exist_ok=True)
         
-        # Generate timestamped filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        html_path = fallback_dir / f"{timestamp}.html"
-        
-        # Generate HTML content
-        html_content = self._generate_html_trace()
+        # Generate timestamped filename; batches failing within the same
+        # second get a numbered suffix instead of overwriting each other
+        timestamp = _now_compact()
+        suffix = 0
+        while True:
+            name = f"{timestamp}.html" if suffix == 0 else f"{timestamp}_{suffix}.html"
+            html_path = fallback_dir / name
+            try:
+                fd = os.open(html_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+                break
+            except FileExistsError:
+                suffix += 1
         
-        # Write to file
-        with open(html_path, "w") as f:
-            f.write(html_content)
+        # Stream the document to disk: encode each piece to UTF-8 and write
+        # ~64 KiB chunks straight to the file descriptor
+        try:
+            pieces = (piece.encode("utf-8") for piece in self._iter_html_chunks(entries))
+            for chunk in _iter_chunks(pieces):
+                _write_all(lambda view: os.write(fd, view), chunk)
+        finally:
+            os.close(fd)
         
         return html_path
     
-    def _generate_html_trace(self) -> str:
-        """Generate HTML representation of buffered logs.
+    def _iter_html_chunks(self, entries: List[Dict[str, Any]]) -> Iterator[str]:
+        """Yield the HTML export document piece by piece.
         
-        Returns:
-            Complete HTML document as string
+        Yields the head, one fragment per log entry, then the tail, so callers
+        can write the document without building it in memory.
+        
+        Args:
+            entries: Log entries to render
         """
-        # Build log entries HTML
-        logs_html = []
-        for log_entry in self.buffer:
+        # The header needs the service name up front (first entry that has one)
+        service_name = next(
+            (e["service_name"] for e in entries if "service_name" in e),
+            "Unknown Service",
+        )
+        yield HTML_HEAD.format(
+            timestamp=_now_display(),
+            count=len(entries),
+            service_name=html.escape(str(service_name)),
+        )
+        
+        # Levels and trace/span IDs repeat across entries - escape each
+        # distinct value once (keyed by its text, as IDs logged as top-level
+        # fields may be unhashable, e.g. lists)
+        escaped_ids: Dict[str, str] = {}
+        level_classes: Dict[str, str] = {}
+        escape = html.escape
+        template = _ENTRY_TEMPLATE
+        excluded_keys = _DETAILS_EXCLUDED_KEYS
+        
+        def escape_id(value: Any) -> str:
+            text = value if type(value) is str else str(value)
+            escaped = escaped_ids.get(text)
+            if escaped is None:
+                escaped = escaped_ids[text] = escape(text)
+            return escaped
+        
+        for log_entry in entries:
             # Extract metadata from __tracer_meta__ or fall back to top-level
-            meta = log_entry.get("__tracer_meta__", {})
-            level = meta.get("level", log_entry.get("level", "info")).lower()
-            event = meta.get("event", log_entry.get("event", ""))
-            timestamp = meta.get("timestamp", log_entry.get("timestamp", ""))
-            
-            # Extract trace information
-            trace_id = meta.get("trace_id", log_entry.get("trace_id", "N/A"))
-            span_id = meta.get("span_id", log_entry.get("span_id", "N/A"))
-            parent_span_id = meta.get("parent_span_id", log_entry.get("parent_span_id", "N/A"))
+            meta = log_entry.get("__tracer_meta__")
+            get = (meta if meta is not None else log_entry).get
             
-            # Create details dict (exclude __tracer_meta__ and duplicate timestamp if present)
-            details = {k: v for k, v in log_entry.items() 
-                      if k not in ["__tracer_meta__", "timestamp"]}
+            level = get("level", "info")
+            if type(level) is not str:
+                level = str(level)
+            level_class = level_classes.get(level)
+            if level_class is None:
+                level_class = level_classes[level] = escape(level.lower())
             
-            details_json = json.dumps(details, indent=2, default=_json_serializer)
+            # Details block: the entry minus __tracer_meta__ and a duplicate
+            # timestamp, copied only when one of those keys is present
+            excluded = excluded_keys.intersection(log_entry)
+            if excluded:
+                details = log_entry.copy()
+                for key in excluded:
+                    del details[key]
+            else:
+                details = log_entry
+            details_json = escape(_dumps(details, indent=True).decode("utf-8"), quote=False)
             
-            log_html = f"""
-            <div class="log-entry">
-                <div class="log-header">
-                    <span class="log-level {level}">{level}</span>
-                    <span class="log-timestamp">{timestamp}</span>
-                </div>
-                <div class="log-event">{event}</div>
-                <div class="trace-info">
-                    <div class="trace-field">
-                        <div class="trace-label">Trace ID:</div>
-                        <div class="trace-value">{trace_id}</div>
-                    </div>
-                    <div class="trace-field">
-                        <div class="trace-label">Span ID:</div>
-                        <div class="trace-value">{span_id}</div>
-                    </div>
-                    <div class="trace-field">
-                        <div class="trace-label">Parent Span:</div>
-                        <div class="trace-value">{parent_span_id}</div>
-                    </div>
-                </div>
-                <div class="log-details">{details_json}</div>
-            </div>
-            """
-            logs_html.append(log_html)
-        
-        # Extract service name from logs (if available)
-        service_name = "Unknown Service"
-        for log_entry in self.buffer:
-            if "service_name" in log_entry:
-                service_name = log_entry["service_name"]
-                break
-        
-        # Fill template
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        html = HTML_TEMPLATE.format(
-            timestamp=timestamp,
-            count=len(self.buffer),
-            service_name=service_name,
-            logs_html="\n".join(logs_html)
-        )
+            yield template % (
+                level_class,
+                level_class,
+                escape(str(get("timestamp", ""))),
+                escape(str(get("event", ""))),
+                escape_id(get("trace_id", "N/A")),
+                escape_id(get("span_id", "N/A")),
+                escape_id(get("parent_span_id", "N/A")),
+                details_json,
+            )
         
-        return html
+        yield HTML_TAIL
     
-    def _flush_file(self) -> Dict[str, Any]:
-        """Flush logs to file (append mode, one JSON object per line)."""
-        with open(self.target_value, "a") as f:
-            for log_entry in self.buffer:
-                json.dump(log_entry, f, default=_json_serializer)
-                f.write("\n")
+    def _flush_file(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Flush logs to file (append mode, one JSON object per line).
+        
+        The file stays open between flushes and the serialized batch is
+        staged in a reusable buffer, so each flush costs one write().
+        Afterwards the kernel is told the written pages will not be read
+        back; with AITRACE_FILE_FSYNC=1 the data is synced first, which
+        also lets those pages be dropped right away.
+        """
+        with self._write_lock:
+            buf = self._write_buf
+            try:
+                for log_entry in entries:
+                    buf += _dumps(log_entry, newline=True)
+                f = self._open_target_file()
+                _write_all(f.write, buf)
+                if self.file_fsync:
+                    _datasync(f.fileno())
+                if _FADV_DONTNEED is not None:
+                    try:
+                        os.posix_fadvise(f.fileno(), 0, 0, _FADV_DONTNEED)
+                    except OSError:
+                        # Only a hint; e.g. a FIFO target rejects it (ESPIPE)
+                        pass
+            except BaseException:
+                # A failed write may still hold a view of buf - start over
+                self._write_buf = bytearray()
+                raise
+            
+            # Keep the staging buffer, unless one large batch blew it up
+            if len(buf) > _WRITE_BUF_SOFT_CAP:
+                self._write_buf = bytearray()
+            else:
+                buf.clear()
         
         return {
-            "ingested": len(self.buffer),
+            "ingested": len(entries),
             "target": "file",
             "path": str(self.target_value)
         }
     
-    def _flush_stdout(self) -> Dict[str, Any]:
+    def _open_target_file(self):
+        """Return the open target file, reopening it if it was rotated away.
+        
+        Caller holds _write_lock. A log rotator that renames or deletes the
+        file leaves the open handle pointing at the old inode, so the path is
+        compared with the inode recorded at open time, at most once every
+        _ROTATION_CHECK_INTERVAL_S (one stat() instead of one per flush).
+        """
+        f = self._file
+        if f is not None:
+            now = time.monotonic()
+            if now - self._file_checked_at < _ROTATION_CHECK_INTERVAL_S:
+                return f
+            self._file_checked_at = now
+            try:
+                current = os.stat(self.target_value)
+                if (current.st_ino, current.st_dev) == self._file_id:
+                    return f
+            except FileNotFoundError:
+                pass
+            f.close()
+        
+        self._file = f = open(self.target_value, "ab", buffering=0)
+        opened = os.fstat(f.fileno())
+        self._file_id = (opened.st_ino, opened.st_dev)
+        self._file_checked_at = time.monotonic()
+        return f
+    
+    def _close_file(self):
+        """Close the target file handle if it is open."""
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+    
+    def _flush_stdout(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Flush logs to stdout (one JSON object per line)."""
-        for log_entry in self.buffer:
-            json.dump(log_entry, sys.stdout, default=_json_serializer)
-            sys.stdout.write("\n")
-        sys.stdout.flush()
+        lines = [_dumps(log_entry, newline=True) for log_entry in entries]
+        
+        # Flush the text layer first so earlier prints keep their order, then
+        # write bytes straight to the file descriptor. Streams without one
+        # (e.g. StringIO in tests) get the binary layer or decoded text.
+        # The lock keeps the partial writes of concurrent batches from
+        # interleaving mid-line.
+        with self._write_lock:
+            sys.stdout.flush()
+            fd = _stdout_fd()
+            if fd is not None:
+                write = functools.partial(os.write, fd)
+                for chunk in _iter_chunks(lines):
+                    _write_all(write, chunk)
+            else:
+                stream = getattr(sys.stdout, "buffer", None)
+                for chunk in _iter_chunks(lines):
+                    if stream is not None:
+                        stream.write(chunk)
+                    else:
+                        sys.stdout.write(chunk.decode("utf-8"))
+                (stream or sys.stdout).flush()
         
         return {
-            "ingested": len(self.buffer),
+            "ingested": len(entries),
             "target": "stdout"
         }
     
@@ -1,8 +1,21 @@
 """Configuration management for AI Trace Viewer."""
+import functools
+import os
+import tomllib
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Any, Optional, Union
 
-import configargparse
+if TYPE_CHECKING:
+    import configargparse
+
+
+# Resolved once at import; HOME does not change for the life of the process
+_HOME = Path.home()
+_CONFIG_DIR = _HOME / ".config" / "aitrace"
+
+# Set once get_config_dir() has made sure the directory exists
+_config_dir_created = False
 
 
 def path_to_display(path: Union[Path, str]) -> str:
@@ -17,7 +30,7 @@ def path_to_display(path: Union[Path, str]) -> str:
     path = Path(path)
     try:
         # Try to make it relative to home
-        rel = path.relative_to(Path.home())
+        rel = path.relative_to(_HOME)
         return f"~/{rel}"
     except ValueError:
         # Not relative to home, return as-is
@@ -37,10 +50,18 @@ def expand_path(path: Union[Path, str]) -> Path:
 
 
 def get_config_dir() -> Path:
-    """Get the configuration directory path."""
-    config_dir = Path.home() / ".config" / "aitrace"
-    config_dir.mkdir(parents=True, exist_ok=True)
-    return config_dir
+    """Get the configuration directory path (created on first call)."""
+    global _config_dir_created
+    if not _config_dir_created:
+        _CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        _config_dir_created = True
+    return _CONFIG_DIR
+
+
+def _list_config_dir(config_dir: Path) -> set:
+    """Return the names of the entries in config_dir (a single scandir call)."""
+    with os.scandir(config_dir) as entries:
+        return {entry.name for entry in entries}
 
 
 def get_data_dir() -> Path:
@@ -48,31 +69,82 @@ def get_data_dir() -> Path:
     return get_config_dir()
 
 
-def create_parser() -> configargparse.ArgumentParser:
+def _flatten_toml(table: dict, result: "OrderedDict[str, Any]") -> None:
+    """Copy TOML settings into result, lifting keys out of [section] tables.
+    
+    Values are converted the way configargparse's YAML parser does:
+    lists are kept (items as strings), None is dropped, the rest is str().
+    """
+    for key, value in table.items():
+        if isinstance(value, dict):
+            _flatten_toml(value, result)
+        elif isinstance(value, list):
+            result[key] = [str(item) for item in value]
+        elif value is not None:
+            result[key] = str(value)
+
+
+@functools.cache
+def _config_file_parser_class():
+    """Return the config file parser class (configargparse is imported lazily)."""
+    import configargparse
+    
+    class ConfigFileParser(configargparse.YAMLConfigFileParser):
+        """Parses *.toml config files with tomllib, anything else as YAML."""
+        
+        def get_syntax_description(self):
+            return (
+                "Config files ending in .toml use TOML syntax; other config "
+                "files use YAML syntax. Both must contain 'key = value' pairs."
+            )
+        
+        def parse(self, stream):
+            if not str(getattr(stream, "name", "")).endswith(".toml"):
+                return super().parse(stream)
+            
+            try:
+                parsed_obj = tomllib.loads(stream.read())
+            except tomllib.TOMLDecodeError as e:
+                raise configargparse.ConfigFileParserException(
+                    "Couldn't parse config file: %s" % e
+                )
+            
+            result = OrderedDict()
+            _flatten_toml(parsed_obj, result)
+            return result
+    
+    return ConfigFileParser
+
+
+@functools.cache
+def create_parser() -> "configargparse.ArgumentParser":
     """
     Create argument parser with support for config file, env vars, and CLI args.
     
+    The parser (and the config file probe) is built once per process; call
+    `create_parser.cache_clear()` to pick up a newly created config file.
+    
     Priority (highest to lowest):
     1. Command line arguments
     2. Environment variables (prefixed with AITRACE_)
-    3. Config file (~/.config/aitrace/config.yaml or config.toml)
+    3. Config file (~/.config/aitrace/config.toml, or config.yaml if there is no TOML file)
     4. Defaults
     """
-    config_dir = get_config_dir()
+    # Imported here so `import aitrace` doesn't pay for configargparse
+    import configargparse
     
-    # Look for config files
-    config_files = [
-        config_dir / "config.yaml",
-        config_dir / "config.toml",
-    ]
+    config_dir = get_config_dir()
     
-    # Filter to existing files
-    existing_configs = [str(f) for f in config_files if f.exists()]
+    # Look for config files (one directory listing): config.toml wins over config.yaml
+    names = _list_config_dir(config_dir)
+    existing_configs = [
+        str(config_dir / name) for name in ("config.toml", "config.yaml") if name in names
+    ][:1]
     
     parser = configargparse.ArgumentParser(
         description="AI Trace Viewer - View structured logs as execution trees",
         default_config_files=existing_configs,
-        config_file_parser_class=configargparse.YAMLConfigFileParser,
+        config_file_parser_class=_config_file_parser_class(),
         formatter_class=configargparse.ArgumentDefaultsHelpFormatter,
         auto_env_var_prefix="AITRACE_",
     )
@@ -81,7 +153,7 @@ def create_parser() -> configargparse.ArgumentParser:
         "-c",
         "--config",
         is_config_file=True,
-        help="Path to config file (YAML or TOML)",
+        help="Path to config file (TOML if it ends in .toml, otherwise YAML)",
     )
     
     parser.add_argument(
@@ -147,27 +219,73 @@ def create_parser() -> configargparse.ArgumentParser:
     return parser
 
 
-def load_config(args: Optional[list] = None):
+def _resolve_db_path(db_path: Optional[str]) -> str:
+    """Return the absolute database path, defaulting to {data_dir}/logs.db."""
+    if db_path is None:
+        return str(get_data_dir() / "logs.db")
+    # Expand ~ and resolve to absolute path
+    return str(expand_path(db_path))
+
+
+class LazyConfig:
+    """Configuration namespace that reads its sources on first attribute access.
+    
+    Attributes assigned before the first read take precedence over the
+    parsed values. `db_path` is expanded only when it is read.
+    """
+    
+    def __init__(self, args: Optional[list] = None):
+        self.__dict__["_args"] = args
+    
+    def _load(self):
+        """Parse CLI args, env vars and config files into this namespace."""
+        namespace = create_parser().parse_args(self._args)
+        values = self.__dict__
+        for key, value in vars(namespace).items():
+            if key == "db_path":
+                if "db_path" not in values:
+                    values["_db_path_resolver"] = functools.partial(_resolve_db_path, value)
+            else:
+                values.setdefault(key, value)
+        values["_loaded"] = True
+    
+    def __getattr__(self, name: str):
+        # Only called for attributes missing from __dict__
+        values = self.__dict__
+        if name.startswith("__"):
+            raise AttributeError(name)
+        if "_loaded" not in values:
+            self._load()
+            return getattr(self, name)
+        if name == "db_path" and "_db_path_resolver" in values:
+            db_path = values["db_path"] = values.pop("_db_path_resolver")()
+            return db_path
+        raise AttributeError(name)
+    
+    def __repr__(self) -> str:
+        if "_loaded" not in self.__dict__:
+            self._load()
+        self.db_path  # resolve before listing
+        items = ", ".join(
+            f"{key}={value!r}" for key, value in self.__dict__.items() if not key.startswith("_")
+        )
+        return f"LazyConfig({items})"
+
+
+def load_config(args: Optional[list] = None) -> LazyConfig:
     """
     Load configuration from all sources.
     
+    Sources are parsed on first attribute access, so creating the config is
+    free for code paths that never read it.
+    
     Args:
         args: Command line arguments (defaults to sys.argv[1:])
     
     Returns:
         Namespace with configuration values
     """
-    parser = create_parser()
-    config = parser.parse_args(args)
-    
-    # Set default db_path if not specified, then expand it
-    if config.db_path is None:
-        config.db_path = str(get_data_dir() / "logs.db")
-    else:
-        # Expand ~ and resolve to absolute path
-        config.db_path = str(expand_path(config.db_path))
-    
-    return config
+    return LazyConfig(args)
 
 
 def generate_default_config_yaml() -> str:
@@ -232,28 +350,29 @@ def init_config_files():
     """Initialize default config files if they don't exist."""
     config_dir = get_config_dir()
     
-    yaml_config = config_dir / "config.yaml.example"
     toml_config = config_dir / "config.toml.example"
+    yaml_config = config_dir / "config.yaml.example"
     
-    if not yaml_config.exists():
-        yaml_config.write_text(generate_default_config_yaml())
-        print(f"Created example config: {path_to_display(yaml_config)}")
-    
-    if not toml_config.exists():
-        toml_config.write_text(generate_default_config_toml())
-        print(f"Created example config: {path_to_display(toml_config)}")
+    # Exclusive create: no exists() probe, and never overwrites a user's edits
+    for example, generate in (
+        (toml_config, generate_default_config_toml),
+        (yaml_config, generate_default_config_yaml),
+    ):
+        try:
+            with example.open("x") as f:
+                f.write(generate())
+        except FileExistsError:
+            continue
+        print(f"Created example config: {path_to_display(example)}")
     
     # Check if user has an active config
-    active_configs = [
-        config_dir / "config.yaml",
-        config_dir / "config.toml",
-    ]
+    names = _list_config_dir(config_dir)
     
-    if not any(c.exists() for c in active_configs):
+    if "config.toml" not in names and "config.yaml" not in names:
         print("\nNo active config found. To create one, run:")
-        print(f"  cp {path_to_display(yaml_config)} {path_to_display(config_dir / 'config.yaml')}")
-        print("  # or")
         print(f"  cp {path_to_display(toml_config)} {path_to_display(config_dir / 'config.toml')}")
+        print("  # or")
+        print(f"  cp {path_to_display(yaml_config)} {path_to_display(config_dir / 'config.yaml')}")
 
 
 # Global config instance
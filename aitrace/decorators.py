@@ -5,6 +5,18 @@ from opentelemetry import trace
 import structlog
 
 
+# Set once a real tracer provider is installed (it cannot be replaced afterwards)
+_tracing_enabled = False
+
+
+def _tracing_configured() -> bool:
+    """Return True once a tracer provider has been set (e.g. by setup_tracing)."""
+    global _tracing_enabled
+    if not _tracing_enabled:
+        _tracing_enabled = not isinstance(trace.get_tracer_provider(), trace.ProxyTracerProvider)
+    return _tracing_enabled
+
+
 def auto_span(name: Optional[str] = None, **span_kwargs):
     """
     Decorator that creates a child span around the function call.
@@ -13,6 +25,9 @@ def auto_span(name: Optional[str] = None, **span_kwargs):
     - {function_name}.start: Provisional event when span begins
     - {function_name}.end: Final event when span completes
     
+    Until a tracer provider is configured (see setup_tracing), the function
+    is called directly, without a span or lifecycle events.
+    
     Args:
         name: Optional custom span name. If not provided, uses function's qualified name.
         **span_kwargs: Additional arguments to pass to start_as_current_span.
@@ -30,30 +45,43 @@ def auto_span(name: Optional[str] = None, **span_kwargs):
 
     def decorator(fn):
         span_name = name or fn.__qualname__
+        start_event = span_name + ".start"
+        end_event = span_name + ".end"
+        # Function metadata attached to every span (constant per function),
+        # passed at span start rather than set on the span afterwards
+        start_kwargs = dict(span_kwargs)
+        start_kwargs["attributes"] = {
+            **(span_kwargs.get("attributes") or {}),
+            "code.function": fn.__name__,
+            "code.namespace": fn.__module__,
+        }
 
         @functools.wraps(fn)
         def wrapper(*args, **kwargs):
+            if not _tracing_configured():
+                # Tracing disabled: skip span setup and lifecycle events
+                return fn(*args, **kwargs)
+            
+            # Looked up per call: BufferedLogger/setup_logging may reconfigure
+            # structlog after decoration, and a proxy bound here would keep
+            # the configuration it was first used with
             log = structlog.get_logger()
             
-            with tracer.start_as_current_span(span_name, **span_kwargs) as span:
-                # Add function metadata
-                span.set_attribute("code.function", fn.__name__)
-                span.set_attribute("code.namespace", fn.__module__)
-                
+            with tracer.start_as_current_span(span_name, **start_kwargs):
                 # Emit span start event (provisional)
-                log.info(f"{span_name}.start", provisional=True)
+                log.info(start_event, provisional=True)
                 
                 try:
                     # Execute function
                     result = fn(*args, **kwargs)
                     
                     # Emit span end event (final)
-                    log.info(f"{span_name}.end")
+                    log.info(end_event)
                     
                     return result
                 except Exception as e:
                     # Emit span end event even on error
-                    log.error(f"{span_name}.end", error=str(e), exc_info=True)
+                    log.error(end_event, error=str(e), exc_info=True)
                     raise
         
         return wrapper
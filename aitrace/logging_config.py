@@ -1,15 +1,45 @@
 """structlog configuration that injects OpenTelemetry trace IDs and source location."""
-import inspect
+import functools
+import json
+import os
+import sys
 import structlog
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 from opentelemetry import trace
 
+from .config import get_config
+
+try:
+    import orjson
+except ImportError:  # optional "fast" extra
+    orjson = None
+
 
 # Cache for workspace root detection
 _workspace_root: Optional[Path] = None
 
 
+# Files/directories that mark a workspace root
+_WORKSPACE_MARKERS = frozenset(('.git', 'pyproject.toml', 'setup.py', 'requirements.txt'))
+
+# Directory -> whether it contains a workspace marker
+_marker_dir_cache: Dict[Path, bool] = {}
+
+
+def _has_workspace_marker(directory: Path) -> bool:
+    """Check a directory for workspace markers with a single scandir call."""
+    found = _marker_dir_cache.get(directory)
+    if found is None:
+        try:
+            with os.scandir(directory) as entries:
+                found = any(entry.name in _WORKSPACE_MARKERS for entry in entries)
+        except OSError:
+            found = False
+        _marker_dir_cache[directory] = found
+    return found
+
+
 def _detect_workspace_root() -> Optional[Path]:
     """Detect the workspace/project root directory.
     
@@ -31,17 +61,12 @@ def _detect_workspace_root() -> Optional[Path]:
     # Try to detect from current working directory upwards
     cwd = Path.cwd()
     
-    # Markers in order of priority
-    markers = ['.git', 'pyproject.toml', 'setup.py', 'requirements.txt']
-    
     # Walk up the directory tree
     current = cwd
     while current != current.parent:  # Stop at root
-        for marker in markers:
-            marker_path = current / marker
-            if marker_path.exists():
-                _workspace_root = current
-                return _workspace_root
+        if _has_workspace_marker(current):
+            _workspace_root = current
+            return _workspace_root
         current = current.parent
     
     # If no marker found, use cwd as fallback
@@ -49,9 +74,12 @@ def _detect_workspace_root() -> Optional[Path]:
     return _workspace_root
 
 
+@functools.lru_cache(maxsize=1024)
 def _get_relative_path(absolute_path: str) -> str:
     """Convert absolute path to relative path from workspace root.
     
+    Results are cached per filename; set_workspace_root clears the cache.
+    
     Args:
         absolute_path: Absolute file path
         
@@ -76,7 +104,59 @@ def _get_relative_path(absolute_path: str) -> str:
         return absolute_path
 
 
-def _source_location_processor(_, __, event_dict):
+# Modules whose frames are logging infrastructure, not the log call site
+_SKIP_PREFIXES = ('structlog', 'aitrace.logging_config', 'aitrace.buffer', 'logging')
+
+# Thread entry frames below structlog's async log methods (ainfo() etc.),
+# which run the processor chain in an executor thread
+_EXECUTOR_PREFIXES = ('concurrent.futures', 'threading')
+
+# Fallback when the current thread has no application frame: finds the
+# caller of structlog's async log methods
+_callsite_adder = structlog.processors.CallsiteParameterAdder(
+    (
+        structlog.processors.CallsiteParameter.PATHNAME,
+        structlog.processors.CallsiteParameter.LINENO,
+        structlog.processors.CallsiteParameter.FUNC_NAME,
+    ),
+    additional_ignores=list(_SKIP_PREFIXES),
+)
+
+# Distinguishes absent fields from fields set to None
+_MISSING = object()
+
+
+# id(code object) -> (code object, location), where location is (relative
+# file, function name or None), or None for frames of logging
+# infrastructure; only the line number is read per log call. Keyed by
+# identity: equal code objects can come from different files.
+_code_locations: Dict[int, tuple] = {}
+
+# Oldest entries are evicted beyond this many code objects (bounds memory
+# and keeps generated or reloaded code from being held forever)
+_CODE_LOCATIONS_MAX = 4096
+
+
+def _location(file: str, func_name: Optional[str]) -> tuple:
+    """Return the (file, function) pair stored for a call site."""
+    return (_get_relative_path(file), func_name if func_name and func_name != '<module>' else None)
+
+
+def _code_location(frame) -> Optional[tuple]:
+    """Return the cached source location of a frame's code object."""
+    code = frame.f_code
+    name = frame.f_globals.get("__name__") or "?"
+    if name.startswith(_SKIP_PREFIXES) or name.startswith(_EXECUTOR_PREFIXES):
+        location = None
+    else:
+        location = _location(code.co_filename, code.co_name)
+    if len(_code_locations) >= _CODE_LOCATIONS_MAX:
+        _code_locations.pop(next(iter(_code_locations)), None)
+    _code_locations[id(code)] = (code, location)
+    return location
+
+
+def _source_location_processor(logger, method_name, event_dict):
     """Inject source file and line number information.
     
     Adds:
@@ -84,59 +164,107 @@ def _source_location_processor(_, __, event_dict):
     - line: line number where log was called
     - function: function name (if available)
     """
-    # Walk up the stack to find the actual logging call site
-    # Skip frames from logging infrastructure
-    stack = inspect.stack()
+    # Walk out of logging infrastructure to the first application frame
+    frame = sys._getframe(1)
+    get = _code_locations.get
+    while True:
+        code = frame.f_code
+        entry = get(id(code))
+        if entry is not None and entry[0] is code:
+            location = entry[1]
+        else:
+            location = _code_location(frame)
+        if location is not None or frame.f_back is None:
+            break
+        frame = frame.f_back
     
-    # Find the first frame that's not in structlog or aitrace internal modules
-    skip_modules = {'structlog', 'aitrace.logging_config', 'aitrace.buffer', 'logging'}
-    caller_frame = None
+    if location is None:
+        # No application frame on this thread (async log method running in
+        # an executor): let structlog find the awaiting caller
+        callsite = _callsite_adder(logger, method_name, {})
+        location = _location(callsite["pathname"], callsite["func_name"])
+        line = callsite["lineno"]
+    else:
+        line = frame.f_lineno
     
-    for frame_info in stack[1:]:  # Skip current frame
-        module_name = frame_info.frame.f_globals.get('__name__', '')
-        
-        # Skip internal logging infrastructure frames
-        if not any(skip in module_name for skip in skip_modules):
-            caller_frame = frame_info
-            break
+    event_dict["file"] = location[0]
+    event_dict["line"] = line
     
-    if caller_frame:
-        # Get absolute path and convert to relative
-        abs_path = caller_frame.filename
-        rel_path = _get_relative_path(abs_path)
-        
-        event_dict["file"] = rel_path
-        event_dict["line"] = caller_frame.lineno
-        
-        # Add function name if available and useful
-        func_name = caller_frame.function
-        if func_name and func_name != '<module>':
-            event_dict["function"] = func_name
+    # Add function name if available and useful
+    if location[1] is not None:
+        event_dict["function"] = location[1]
     
     return event_dict
 
 
+def _dict_tracebacks_processor(logger, method_name, event_dict):
+    """Run structlog's dict_tracebacks only for records that carry exc_info."""
+    if "exc_info" in event_dict:
+        return structlog.processors.dict_tracebacks(logger, method_name, event_dict)
+    return event_dict
+
+
+# (span, (trace_id, span_id, parent_span_id)) hex strings of the span that
+# logged last; records of one span reuse them instead of re-formatting
+_last_span_ids: tuple = (None, None)
+
+
 def _otel_ids_processor(_, __, event_dict):
     """Inject trace_id, span_id, and parent_span_id from current OpenTelemetry context."""
+    global _last_span_ids
     span = trace.get_current_span()
-    ctx = span.get_span_context()
+    cached_span, ids = _last_span_ids
+    if cached_span is not span:
+        ids = None
+        ctx = span.get_span_context()
+        if ctx and ctx.is_valid:
+            # Try to get parent span ID
+            parent = getattr(span, "parent", None)
+            ids = (
+                "%032x" % ctx.trace_id,
+                "%016x" % ctx.span_id,
+                "%016x" % parent.span_id if parent and getattr(parent, "is_valid", False) else None,
+            )
+        _last_span_ids = (span, ids)
     
-    if ctx and ctx.is_valid:
-        event_dict["trace_id"] = format(ctx.trace_id, "032x")
-        event_dict["span_id"] = format(ctx.span_id, "016x")
-        
-        # Try to get parent span ID
-        parent = getattr(span, "parent", None)
-        if parent and getattr(parent, "is_valid", False):
-            event_dict["parent_span_id"] = format(parent.span_id, "016x")
+    if ids is not None:
+        event_dict["trace_id"] = ids[0]
+        event_dict["span_id"] = ids[1]
+        if ids[2] is not None:
+            event_dict["parent_span_id"] = ids[2]
     
     return event_dict
 
 
-def _wrap_tracer_metadata_processor(_, __, event_dict):
-    """Wrap tracer metadata into __tracer_meta__ namespace.
+# Metadata fields moved under __tracer_meta__ (see _make_wrap_processor)
+_METADATA_FIELDS = (
+    "timestamp",
+    "event",
+    "trace_id",
+    "span_id",
+    "parent_span_id",
+    "file",
+    "line",
+    "function",
+    "level",
+    "logger",
+    "provisional",
+)
+
+
+def _compat_mode_enabled() -> bool:
+    """Read compat_mode from the global config (False if loading fails)."""
+    try:
+        return bool(getattr(get_config(), "compat_mode", False))
+    except Exception:
+        # If config loading fails, default to no compat mode
+        return False
+
+
+def _make_wrap_processor(compat_mode: bool):
+    """Build the processor that wraps tracer metadata into __tracer_meta__.
     
-    This processor moves all tracer infrastructure fields into a dedicated
+    The processor moves all tracer infrastructure fields into a dedicated
     __tracer_meta__ namespace, leaving user data at the top level.
     
     Metadata fields that get wrapped:
@@ -152,51 +280,53 @@ def _wrap_tracer_metadata_processor(_, __, event_dict):
     - provisional (if present)
     
     In compatibility mode (AITRACE_COMPAT_MODE=true), timestamp is duplicated
-    at the top level for external tools like Elastic/OpenTelemetry.
+    at the top level for external tools like Elastic/OpenTelemetry. The flag
+    is fixed when the processor is built, i.e. when logging is configured.
+    
+    Args:
+        compat_mode: Whether to duplicate timestamp at the top level
     """
-    # Import config here to avoid circular import
-    from .config import get_config
-    
-    # Define metadata fields to wrap
-    metadata_fields = [
-        "timestamp",
-        "event",
-        "trace_id",
-        "span_id",
-        "parent_span_id",
-        "file",
-        "line",
-        "function",
-        "level",
-        "logger",
-        "provisional",
-    ]
-    
-    # Create __tracer_meta__ dict with all metadata
-    tracer_meta = {}
-    for field in metadata_fields:
-        if field in event_dict:
-            tracer_meta[field] = event_dict[field]
-    
-    # Only wrap if we have metadata
-    if tracer_meta:
-        # Remove metadata from top-level
-        for field in metadata_fields:
-            event_dict.pop(field, None)
+    def _wrap_tracer_metadata_processor(_, __, event_dict):
+        # Move metadata from top-level into __tracer_meta__ in a single pass
+        tracer_meta = {}
+        pop = event_dict.pop
+        for field in _METADATA_FIELDS:
+            value = pop(field, _MISSING)
+            if value is not _MISSING:
+                tracer_meta[field] = value
         
-        # Add __tracer_meta__ with all metadata
-        event_dict["__tracer_meta__"] = tracer_meta
+        # Only wrap if we have metadata
+        if tracer_meta:
+            # Add __tracer_meta__ with all metadata
+            event_dict["__tracer_meta__"] = tracer_meta
+            
+            # In compatibility mode, duplicate timestamp at top-level
+            if compat_mode and "timestamp" in tracer_meta:
+                event_dict["timestamp"] = tracer_meta["timestamp"]
         
-        # In compatibility mode, duplicate timestamp at top-level
+        return event_dict
+    
+    return _wrap_tracer_metadata_processor
+
+
+def _render_json(event_dict, **dumps_kw) -> str:
+    """JSONRenderer serializer: orjson when installed, stdlib json otherwise.
+    
+    Falls back to json.dumps for values orjson rejects (e.g. integers above
+    64 bits). `dumps_kw` carries structlog's `default=` fallback handler.
+    """
+    if orjson is not None:
         try:
-            config = get_config()
-            if getattr(config, "compat_mode", False) and "timestamp" in tracer_meta:
-                event_dict["timestamp"] = tracer_meta["timestamp"]
-        except Exception:
-            # If config loading fails, default to no compat mode
+            return orjson.dumps(
+                event_dict, default=dumps_kw.get("default"), option=orjson.OPT_NON_STR_KEYS
+            ).decode("utf-8")
+        except TypeError:
             pass
-    
-    return event_dict
+    return json.dumps(event_dict, **dumps_kw)
+
+
+# Shared by setup_logging() and the stdout target of BufferedLogger
+_json_renderer = structlog.processors.JSONRenderer(serializer=_render_json)
 
 
 def setup_logging():
@@ -207,9 +337,9 @@ def setup_logging():
             structlog.processors.TimeStamper(fmt="iso"),
             _source_location_processor,  # Add source file and line info
             _otel_ids_processor,  # Add trace/span IDs
-            structlog.processors.dict_tracebacks,
-            _wrap_tracer_metadata_processor,  # Wrap metadata into __tracer_meta__
-            structlog.processors.JSONRenderer(),
+            _dict_tracebacks_processor,
+            _make_wrap_processor(_compat_mode_enabled()),  # Wrap metadata into __tracer_meta__
+            _json_renderer,
         ],
         cache_logger_on_first_use=True,
     )
@@ -232,6 +362,8 @@ def set_workspace_root(root_path: str | Path) -> None:
     """
     global _workspace_root
     _workspace_root = Path(root_path).resolve()
+    _get_relative_path.cache_clear()
+    _code_locations.clear()
 
 
 def get_workspace_root() -> Optional[Path]:
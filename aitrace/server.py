@@ -1,20 +1,214 @@
 """FastAPI application for viewing structured logs as collapsible trace trees."""
+import asyncio
+import functools
 import json
+import queue
+import re
 import sqlite3
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Union
 
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 
 from .config import get_config_dir, path_to_display
 
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "fast" extra
+    orjson = None
+
+try:
+    import ormsgpack
+except ImportError:  # optional, see the "msgpack" extra
+    ormsgpack = None
+
+try:
+    import zstandard
+except ImportError:  # optional, see the "zstd" extra
+    zstandard = None
+
+# Content type of MessagePack ingest batches (BufferedLogger wire_format="msgpack")
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+
+# Content type of newline-delimited JSON ingest bodies (BufferedLogger wire_format="ndjson")
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
 # Global database path (set by main() or init_app())
 DB_PATH = None
 
+# Number of pooled read connections; writes use one dedicated connection
+DB_POOL_SIZE = 4
+
+# Number of rendered /api/trace payloads kept in memory
+TRACE_CACHE_SIZE = 256
+
+# attrs JSON of at least this many bytes is stored zstd-compressed when the
+# "zstd" extra is installed (shorter values rarely shrink)
+ATTRS_ZSTD_MIN_BYTES = 256
+ATTRS_ZSTD_LEVEL = 3
+
+# Largest request body accepted after gzip decompression
+MAX_INFLATED_BODY_BYTES = 256 * 1024 * 1024
+
+# Per-connection SQLite page cache (KiB) and memory-mapped I/O window (bytes)
+SQLITE_CACHE_KIB = 64 * 1024
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes.
+    
+    Uses orjson when installed and falls back to the stdlib json module
+    otherwise (or for values orjson rejects, e.g. integers above 64 bits).
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+# An integer literal of 19+ digits, which may not fit in 64 bits
+_LONG_INT_RE = re.compile(rb"[:\[,]\s*-?\d{19}")
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON bytes; raises ValueError on invalid input.
+    
+    orjson parses integers outside the 64-bit range as floats without
+    raising, so bodies containing such a literal go to the stdlib json
+    module, which keeps them exact.
+    """
+    if orjson is not None and _LONG_INT_RE.search(data) is None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _encode_attrs(attrs: Dict[str, Any]) -> Union[str, bytes]:
+    """Serialize attrs for the logs table.
+    
+    Large values are stored as a zstd-compressed JSON BLOB when zstandard is
+    installed and compression actually shrinks them; everything else is
+    stored as JSON text.
+    """
+    data = _json_dumps(attrs)
+    if zstandard is not None and len(data) >= ATTRS_ZSTD_MIN_BYTES:
+        packed = zstandard.compress(data, ATTRS_ZSTD_LEVEL)
+        if len(packed) < len(data):
+            return packed
+    return data.decode("utf-8")
+
+
+_zstd_warned = False
+
+
+def _inflate_attrs(blob: bytes) -> bytes:
+    """Decompress a zstd attrs BLOB back to JSON bytes ({} if it can't be read)."""
+    global _zstd_warned
+    if zstandard is None:
+        if not _zstd_warned:
+            _zstd_warned = True
+            print(
+                "⚠️  Some attrs are zstd-compressed; install the \"zstd\" extra to read them",
+                file=sys.stderr,
+            )
+        return b"{}"
+    try:
+        return zstandard.decompress(blob)
+    except zstandard.ZstdError as e:
+        print(f"⚠️  Cannot decompress stored attrs: {e}", file=sys.stderr)
+        return b"{}"
+
+
+def _raw_attrs(text: Union[str, bytes, None]) -> Any:
+    """Prepare a stored attrs column for embedding in a response.
+    
+    With orjson the stored JSON text is wrapped in an orjson.Fragment and
+    copied into the response as-is; otherwise it is parsed so the stdlib
+    encoder can re-serialize it. Compressed BLOBs are inflated first.
+    """
+    if isinstance(text, bytes):
+        text = _inflate_attrs(text)
+    if orjson is not None:
+        return orjson.Fragment(text or "{}")
+    try:
+        return json.loads(text or "{}")
+    except ValueError:
+        return {}
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is installed."""
+    
+    def render(self, content: Any) -> bytes:
+        return _json_dumps(content)
+
+
+class GzipRequestMiddleware:
+    """ASGI middleware that inflates request bodies sent with Content-Encoding: gzip.
+    
+    BufferedLogger compresses larger ingest batches; the body is decompressed
+    incrementally as it is received, so route handlers see plain JSON.
+    A corrupt or truncated body is rejected with 400, and one that inflates
+    beyond MAX_INFLATED_BODY_BYTES with 413.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (b"content-encoding", b"gzip") not in scope["headers"]:
+            await self.app(scope, receive, send)
+            return
+        
+        decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        remaining = MAX_INFLATED_BODY_BYTES
+        
+        async def receive_inflated():
+            # Raised while the route reads its body; FastAPI turns it into the response
+            nonlocal remaining
+            message = await receive()
+            if message["type"] == "http.request":
+                try:
+                    # One byte over the limit is enough to know it was exceeded
+                    body = decompressor.decompress(message.get("body", b""), remaining + 1)
+                    if len(body) > remaining:
+                        raise HTTPException(status_code=413, detail="Decompressed body is too large")
+                    remaining -= len(body)
+                    if not message.get("more_body", False):
+                        body += decompressor.flush()
+                        if not decompressor.eof:
+                            raise HTTPException(status_code=400, detail="Truncated gzip body")
+                except zlib.error as e:
+                    raise HTTPException(status_code=400, detail=f"Invalid gzip body: {e}")
+                message = {**message, "body": body}
+            return message
+        
+        # Body length changes after decompression
+        headers = [
+            (name, value) for name, value in scope["headers"]
+            if name not in (b"content-encoding", b"content-length")
+        ]
+        await self.app({**scope, "headers": headers}, receive_inflated, send)
+
+
 # Initialize FastAPI
-app = FastAPI(title="AI Trace Viewer", description="View structured logs as execution trees")
+app = FastAPI(
+    title="AI Trace Viewer",
+    description="View structured logs as execution trees",
+    default_response_class=FastJSONResponse,
+)
+app.add_middleware(GzipRequestMiddleware)
 
 # Mount static files
 static_dir = Path(__file__).parent / "static"
@@ -32,11 +226,74 @@ def get_db() -> sqlite3.Connection:
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL;")
     conn.execute("PRAGMA foreign_keys=ON;")
+    # Under WAL, NORMAL only syncs at checkpoints: a power loss may drop the
+    # last few commits but cannot corrupt the database, and commits get
+    # several times cheaper than with FULL.
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_KIB};")
+    conn.execute("PRAGMA wal_autocheckpoint=1000;")
+    try:
+        conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE};")
+    except sqlite3.DatabaseError:
+        pass  # memory-mapped I/O is unavailable on some platforms/builds
     return conn
 
 
+# Trigram full-text index over logs.event: substring search (3+ characters)
+# without scanning the table. External content, kept in sync by triggers.
+_FTS_SCHEMA = """
+    CREATE VIRTUAL TABLE logs_fts USING fts5(
+        event, content='logs', content_rowid='id', tokenize='trigram'
+    );
+    CREATE TRIGGER logs_fts_insert AFTER INSERT ON logs BEGIN
+        INSERT INTO logs_fts (rowid, event) VALUES (new.id, new.event);
+    END;
+    CREATE TRIGGER logs_fts_delete AFTER DELETE ON logs BEGIN
+        INSERT INTO logs_fts (logs_fts, rowid, event) VALUES ('delete', old.id, old.event);
+    END;
+"""
+
+# Whether logs_fts exists (set by init_db; SQLite may lack FTS5 or the trigram tokenizer)
+FTS_ENABLED = False
+
+
+def _init_fts(conn: sqlite3.Connection) -> bool:
+    """Create and populate the event full-text index if SQLite supports it."""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'logs_fts'").fetchone():
+        return True
+    try:
+        conn.executescript(_FTS_SCHEMA)
+    except sqlite3.OperationalError:
+        return False
+    # Index rows stored before the table existed
+    conn.execute("INSERT INTO logs_fts (logs_fts) VALUES ('rebuild')")
+    return True
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_US = timedelta(microseconds=1)
+
+
+def _ts_to_us(ts: Any) -> Optional[int]:
+    """Convert an ISO 8601 timestamp to integer microseconds since the epoch.
+    
+    Naive timestamps are taken as UTC; values that do not parse give None.
+    """
+    if not isinstance(ts, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(ts)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return (parsed - _EPOCH) // _ONE_US
+
+
 def init_db(conn: sqlite3.Connection):
     """Initialize database schema."""
+    global FTS_ENABLED
     conn.executescript(
         """
         CREATE TABLE IF NOT EXISTS logs (
@@ -45,37 +302,216 @@ def init_db(conn: sqlite3.Connection):
             level TEXT,
             logger TEXT,
             event TEXT,
-            attrs TEXT,
+            attrs TEXT, -- JSON text, or zstd-compressed JSON stored as a BLOB
             trace_id TEXT NOT NULL,
             span_id TEXT NOT NULL,
-            parent_span_id TEXT
+            parent_span_id TEXT,
+            ts_us INTEGER -- ts as microseconds since the epoch, for range filters
         );
 
-        CREATE INDEX IF NOT EXISTS idx_logs_trace ON logs(trace_id);
+        -- Serves trace lookups already in (ts, id) order; supersedes idx_logs_trace
+        CREATE INDEX IF NOT EXISTS idx_logs_trace_ts_id ON logs(trace_id, ts, id);
+        DROP INDEX IF EXISTS idx_logs_trace;
         CREATE INDEX IF NOT EXISTS idx_logs_span ON logs(span_id);
         CREATE INDEX IF NOT EXISTS idx_logs_parent ON logs(parent_span_id);
         CREATE INDEX IF NOT EXISTS idx_logs_ts ON logs(ts);
+
+        -- One row per span, describing its earliest log record
+        CREATE TABLE IF NOT EXISTS spans (
+            trace_id TEXT NOT NULL,
+            span_id TEXT NOT NULL,
+            parent_span_id TEXT,
+            title TEXT,
+            first_ts TEXT NOT NULL,
+            PRIMARY KEY (trace_id, span_id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_spans_parent ON spans(trace_id, parent_span_id);
+
+        -- Per-trace summary maintained at ingest time (served by /api/traces)
+        CREATE TABLE IF NOT EXISTS traces (
+            trace_id TEXT PRIMARY KEY,
+            start_ts TEXT,
+            end_ts TEXT,
+            events INTEGER NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_traces_end_ts ON traces(end_ts DESC);
         """
     )
+    
+    # Databases created before ts_us existed: add and fill the column
+    if "ts_us" not in {col[1] for col in conn.execute("PRAGMA table_info(logs)")}:
+        conn.execute("ALTER TABLE logs ADD COLUMN ts_us INTEGER")
+        cur = conn.execute("SELECT id, ts FROM logs WHERE ts IS NOT NULL")
+        conn.executemany(
+            "UPDATE logs SET ts_us = ? WHERE id = ?",
+            [(_ts_to_us(ts), rowid) for rowid, ts in cur.fetchall()],
+        )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_ts_us ON logs(ts_us)")
+    
+    FTS_ENABLED = _init_fts(conn)
+    
+    # Backfill summary tables for databases created before they existed
+    if conn.execute("SELECT 1 FROM traces LIMIT 1").fetchone() is None:
+        conn.execute(
+            """
+            INSERT INTO traces (trace_id, start_ts, end_ts, events)
+            SELECT trace_id, MIN(ts), MAX(ts), COUNT(*) FROM logs GROUP BY trace_id
+            """
+        )
+    
+    if conn.execute("SELECT 1 FROM spans LIMIT 1").fetchone() is None:
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO spans (trace_id, span_id, parent_span_id, title, first_ts)
+            SELECT trace_id, span_id, parent_span_id,
+                   COALESCE(
+                       CASE WHEN json_valid(attrs) THEN
+                           COALESCE(NULLIF(json_extract(attrs, '$."code.function"'), ''),
+                                    NULLIF(json_extract(attrs, '$.function'), ''))
+                       END,
+                       NULLIF(event, ''),
+                       span_id
+                   ),
+                   COALESCE(ts, '')
+            FROM logs
+            ORDER BY COALESCE(ts, ''), id
+            """
+        )
     conn.commit()
 
 
 def init_app(db_path: str):
     """Initialize the application with database path."""
-    global DB_PATH, db
+    global DB_PATH, _writer
     DB_PATH = db_path
     
     # Ensure parent directory exists
     Path(db_path).parent.mkdir(parents=True, exist_ok=True)
     
+    # Drop connections to a previously initialized database
+    while True:
+        try:
+            _reader_pool.get_nowait().close()
+        except queue.Empty:
+            break
+    if _writer is not None:
+        _writer.close()
+    with _trace_cache_lock:
+        _trace_cache.clear()
+    
     # Initialize database
-    db = get_db()
-    init_db(db)
+    _writer = get_db()
+    init_db(_writer)
+    for _ in range(DB_POOL_SIZE):
+        _reader_pool.put(get_db())
     print(f"Database initialized at: {path_to_display(db_path)}")
 
 
-# Global database connection (initialized by init_app)
-db = None
+# Read connections (filled by init_app); WAL lets them run alongside the writer
+_reader_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+
+# The single write connection and the lock serializing its use
+_writer: Optional[sqlite3.Connection] = None
+_writer_lock = threading.Lock()
+
+# Routes run database work off the event loop: reads on asyncio.to_thread,
+# ingest writes on this single thread so they never contend for the writer
+_writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aitrace-db-writer")
+
+
+@contextmanager
+def pool_conn() -> Iterator[sqlite3.Connection]:
+    """Borrow a read connection from the pool, returning it afterwards."""
+    conn = _reader_pool.get()
+    try:
+        yield conn
+    finally:
+        _reader_pool.put(conn)
+
+
+@contextmanager
+def writer_conn() -> Iterator[sqlite3.Connection]:
+    """Hold the dedicated write connection for the duration of the block."""
+    if _writer is None:
+        raise RuntimeError("Database not initialized. Call init_app() first.")
+    with _writer_lock:
+        yield _writer
+
+
+# Rendered trace payloads: trace_id -> (event count, max ts, JSON body), in LRU order
+_trace_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_trace_cache_lock = threading.Lock()
+
+
+def _cached_trace(trace_id: str, events: int, max_ts: Optional[str]) -> Optional[bytes]:
+    """Return the cached payload for trace_id if it matches the trace's current state."""
+    with _trace_cache_lock:
+        entry = _trace_cache.get(trace_id)
+        if entry is None or entry[0] != events or entry[1] != max_ts:
+            return None
+        _trace_cache.move_to_end(trace_id)
+        return entry[2]
+
+
+def _cache_trace(trace_id: str, events: int, max_ts: Optional[str], body: bytes) -> None:
+    """Store a rendered trace payload, evicting the least recently used one."""
+    with _trace_cache_lock:
+        _trace_cache[trace_id] = (events, max_ts, body)
+        _trace_cache.move_to_end(trace_id)
+        if len(_trace_cache) > TRACE_CACHE_SIZE:
+            _trace_cache.popitem(last=False)
+
+
+def _invalidate_traces(trace_ids) -> None:
+    """Drop cached payloads of traces that received new records."""
+    with _trace_cache_lock:
+        for trace_id in trace_ids:
+            _trace_cache.pop(trace_id, None)
+
+
+# Column order of positional INSERT parameters
+_INSERT_COLUMNS = (
+    "ts", "level", "logger", "event", "attrs", "trace_id", "span_id", "parent_span_id", "ts_us",
+)
+
+# Rows per multi-row INSERT (9 parameters each, well below SQLite's limit of 32766)
+_INSERT_BATCH_ROWS = 500
+
+_INSERT_ROW_SQL = (
+    "INSERT INTO logs (ts, level, logger, event, attrs, trace_id, span_id, parent_span_id, ts_us) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_INSERT_BATCH_SQL = _INSERT_ROW_SQL + ", (?, ?, ?, ?, ?, ?, ?, ?, ?)" * (_INSERT_BATCH_ROWS - 1)
+
+# Merge a batch's per-trace aggregate; scalar MIN/MAX return NULL if either side is NULL
+_UPSERT_TRACE_SQL = """
+    INSERT INTO traces (trace_id, start_ts, end_ts, events)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (trace_id) DO UPDATE SET
+        start_ts = COALESCE(MIN(excluded.start_ts, start_ts), excluded.start_ts, start_ts),
+        end_ts = COALESCE(MAX(excluded.end_ts, end_ts), excluded.end_ts, end_ts),
+        events = events + excluded.events
+"""
+
+# A span's row follows its earliest record; on equal timestamps the first ingested wins
+_UPSERT_SPAN_SQL = """
+    INSERT INTO spans (trace_id, span_id, parent_span_id, title, first_ts)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (trace_id, span_id) DO UPDATE SET
+        parent_span_id = excluded.parent_span_id,
+        title = excluded.title,
+        first_ts = excluded.first_ts
+    WHERE excluded.first_ts < spans.first_ts
+"""
+
+
+# Top-level record keys that are stored in dedicated columns, not in attrs
+_RECORD_META_KEYS = frozenset((
+    "__tracer_meta__", "timestamp", "ts", "@timestamp", "level", "lvl", "logger", "name",
+    "event", "message", "msg", "trace_id", "span_id", "parent_span_id", "parent_id",
+))
 
 
 def normalize_record(d: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -101,19 +537,12 @@ def normalize_record(d: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     if not (trace_id and span_id):
         return None
     
-    # Copy dict to avoid modifying original
-    attrs = dict(d)
+    # Build attrs in one pass, without the metadata stored in dedicated
+    # columns (__tracer_meta__, compat-mode and old-format top-level fields)
+    attrs = {k: v for k, v in d.items() if k not in _RECORD_META_KEYS}
     
-    # Remove __tracer_meta__ from attrs (metadata is stored in dedicated columns)
-    attrs.pop("__tracer_meta__", None)
-    
-    # Remove duplicate timestamp if present (compat mode)
-    attrs.pop("timestamp", None)
-    
-    # Remove other top-level metadata fields (in case of compat mode or old format)
-    for key in ("ts", "@timestamp", "level", "lvl", "logger", "name",
-                "event", "message", "msg", "trace_id", "span_id", "parent_span_id", "parent_id"):
-        attrs.pop(key, None)
+    # Span title shown in the tree (stored in the spans table)
+    title = attrs.get("code.function") or attrs.get("function") or event or span_id
     
     return {
         "ts": ts,
@@ -123,93 +552,164 @@ def normalize_record(d: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         "trace_id": trace_id,
         "span_id": span_id,
         "parent_span_id": parent_span_id,
-        "attrs": json.dumps(attrs, ensure_ascii=False),
+        "attrs": _encode_attrs(attrs),
+        "title": title if isinstance(title, str) else str(title),
+        "ts_us": _ts_to_us(ts),
     }
 
 
 def ingest_records(conn: sqlite3.Connection, records: List[Dict[str, Any]]) -> int:
-    """Ingest log records into the database."""
-    rows = []
-    for rec in records:
-        norm = normalize_record(rec)
-        if norm:
-            rows.append(norm)
-    
-    if rows:
-        with conn:
+    """Ingest log records into the database.
+    
+    All rows are written in one IMMEDIATE transaction. Records are
+    normalized as they are inserted: every _INSERT_BATCH_ROWS rows go out
+    as one multi-row INSERT statement and the remainder through the
+    single-row statement, so only one batch of parameters is held at a
+    time. The spans and traces summary tables are updated in the same
+    transaction.
+    """
+    if not records:
+        return 0
+    
+    count = 0
+    args: List[Any] = []
+    # (trace_id, span_id) -> spans row of the span's earliest record
+    first_of_span: Dict[tuple, tuple] = {}
+    # trace_id -> [start_ts, end_ts, events]
+    summary: Dict[str, list] = {}
+    
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for rec in records:
+            row = normalize_record(rec)
+            if row is None:
+                continue
+            count += 1
+            args.extend([row[col] for col in _INSERT_COLUMNS])
+            if count % _INSERT_BATCH_ROWS == 0:
+                conn.execute(_INSERT_BATCH_SQL, args)
+                args = []
+            
+            trace_id, ts = row["trace_id"], row["ts"]
+            key = (trace_id, row["span_id"])
+            seen = first_of_span.get(key)
+            if seen is None or (ts or "") < seen[4]:
+                first_of_span[key] = (trace_id, row["span_id"], row["parent_span_id"], row["title"], ts or "")
+            
+            agg = summary.get(trace_id)
+            if agg is None:
+                summary[trace_id] = [ts, ts, 1]
+            else:
+                agg[2] += 1
+                if ts is not None:
+                    if agg[0] is None or ts < agg[0]:
+                        agg[0] = ts
+                    if agg[1] is None or ts > agg[1]:
+                        agg[1] = ts
+        
+        if args:
+            width = len(_INSERT_COLUMNS)
             conn.executemany(
-                """
-                INSERT INTO logs (ts, level, logger, event, attrs, trace_id, span_id, parent_span_id)
-                VALUES (:ts, :level, :logger, :event, :attrs, :trace_id, :span_id, :parent_span_id)
-                """,
-                rows,
+                _INSERT_ROW_SQL,
+                (args[i:i + width] for i in range(0, len(args), width)),
             )
+        conn.executemany(_UPSERT_SPAN_SQL, first_of_span.values())
+        conn.executemany(
+            _UPSERT_TRACE_SQL,
+            ((trace_id, *agg) for trace_id, agg in summary.items()),
+        )
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
     
-    return len(rows)
+    _invalidate_traces(summary)
+    return count
+
+
+# Depth-first walk of a trace's spans. Roots are spans whose parent is not part
+# of the trace; the sort path joins (first_ts, span_id) of every ancestor with
+# control-character separators so siblings order by their first timestamp.
+_SPAN_TREE_SQL = """
+    WITH RECURSIVE tree(span_id, parent_span_id, title, depth, path) AS (
+        SELECT span_id, parent_span_id, title, 0, first_ts || char(2) || span_id
+        FROM spans
+        WHERE trace_id = :trace_id
+          AND (parent_span_id IS NULL OR parent_span_id = ''
+               OR parent_span_id NOT IN (SELECT span_id FROM spans WHERE trace_id = :trace_id))
+        UNION ALL
+        SELECT s.span_id, s.parent_span_id, s.title, tree.depth + 1,
+               tree.path || char(1) || s.first_ts || char(2) || s.span_id
+        FROM spans s
+        JOIN tree ON s.trace_id = :trace_id AND s.parent_span_id = tree.span_id
+    )
+    SELECT span_id, parent_span_id, title, depth FROM tree ORDER BY path
+"""
+
+
+# Per-span log columns returned by fetch_trace
+_LOG_COLUMNS = ("ts", "level", "logger", "event", "attrs")
 
 
 def fetch_trace(conn: sqlite3.Connection, trace_id: str) -> Optional[Dict]:
-    """Fetch all logs for a trace and build tree structure."""
-    cur = conn.execute(
+    """Fetch all logs for a trace and build tree structure.
+    
+    Log rows come back in (ts, id) order straight from idx_logs_trace_ts_id;
+    rows without a timestamp sort first. logs_by_span maps each span to a
+    dict of parallel column lists keyed by _LOG_COLUMNS.
+    """
+    cur = conn.cursor()
+    cur.row_factory = None  # plain tuples; no per-row mapping objects
+    cur.execute(
         """
-        SELECT ts, level, logger, event, attrs, trace_id, span_id, parent_span_id
+        SELECT span_id, ts, level, logger, event, attrs
         FROM logs
         WHERE trace_id = ?
-        ORDER BY COALESCE(ts, ''), id
+        ORDER BY ts, id
         """,
         (trace_id,),
     )
-    rows = [dict(r) for r in cur.fetchall()]
+    rows = cur.fetchall()
     
     if not rows:
         return None
     
-    # Group logs by span
-    logs_by_span: Dict[str, List[Dict]] = {}
+    # Group logs by span in columnar form: one list per field, no row dicts
+    logs_by_span: Dict[str, Dict[str, List[Any]]] = {}
+    for sid, ts, level, logger, event, attrs in rows:
+        cols = logs_by_span.get(sid)
+        if cols is None:
+            cols = logs_by_span[sid] = {key: [] for key in _LOG_COLUMNS}
+        cols["ts"].append(ts)
+        cols["level"].append(level)
+        cols["logger"].append(logger)
+        cols["event"].append(event)
+        cols["attrs"].append(attrs)
+    
+    # Walk the span tree in SQL: rows arrive depth-first with siblings
+    # ordered by their first timestamp, so children lists need no sorting
     parent_for_span: Dict[str, Optional[str]] = {}
-    
-    for r in rows:
-        sid = r["span_id"]
-        logs_by_span.setdefault(sid, []).append(r)
-        if sid not in parent_for_span:
-            parent_for_span[sid] = r.get("parent_span_id")
-    
-    # Build children map and find roots
-    children: Dict[str, List[str]] = {sid: [] for sid in logs_by_span}
+    title_for_span: Dict[str, str] = {}
+    children: Dict[str, List[str]] = {}
     roots: List[str] = []
     
-    for sid, parent in parent_for_span.items():
-        if parent and parent in children:
+    # One pass over plain tuples (same row_factory=None cursor as above)
+    for sid, parent, title, depth in cur.execute(_SPAN_TREE_SQL, {"trace_id": trace_id}):
+        parent_for_span[sid] = parent
+        title_for_span[sid] = title
+        children[sid] = []
+        if depth:
             children[parent].append(sid)
         else:
             roots.append(sid)
     
-    # Sort children by timestamp
-    def first_ts(span_id: str) -> str:
-        recs = logs_by_span.get(span_id, [])
-        return recs[0]["ts"] or "" if recs else ""
-    
-    for cid_list in children.values():
-        cid_list.sort(key=first_ts)
-    
-    # Get span titles
-    def node_title(span_id: str) -> str:
-        first = logs_by_span[span_id][0]
-        try:
-            attrs = json.loads(first["attrs"] or "{}")
-        except Exception:
-            attrs = {}
-        fn = attrs.get("code.function") or attrs.get("function") or ""
-        ev = first.get("event") or ""
-        return fn or ev or span_id
-    
     return {
         "trace_id": trace_id,
         "roots": roots,
         "children": children,
         "logs_by_span": logs_by_span,
         "parent_for_span": parent_for_span,
-        "title_for_span": {sid: node_title(sid) for sid in logs_by_span},
+        "title_for_span": title_for_span,
     }
 
 
@@ -231,37 +731,136 @@ async def root():
     """)
 
 
+def _decode_ingest_body(body: bytes, content_type: str) -> List[Dict[str, Any]]:
+    """Decode and validate a JSON or MessagePack /api/ingest body."""
+    if content_type.startswith(MSGPACK_CONTENT_TYPE):
+        if ormsgpack is None:
+            raise HTTPException(status_code=415, detail="MessagePack support is not installed")
+        try:
+            records = ormsgpack.unpackb(body)
+        except ormsgpack.MsgpackDecodeError as e:
+            raise HTTPException(status_code=422, detail=f"Invalid MessagePack body: {e}")
+    else:
+        try:
+            records = _json_loads(body)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f"Invalid JSON body: {e}")
+    
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        raise HTTPException(status_code=422, detail="Expected an array of log record objects")
+    return records
+
+
+def _ingest_with_writer(records: List[Dict[str, Any]]) -> int:
+    """Run ingest_records on the writer connection (writer thread only)."""
+    with writer_conn() as conn:
+        return ingest_records(conn, records)
+
+
+async def _write_records(records: List[Dict[str, Any]]) -> int:
+    """Ingest records on the single database writer thread."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_writer_executor, _ingest_with_writer, records)
+
+
 @app.post("/api/ingest")
-async def ingest(records: List[Dict[str, Any]]):
+async def ingest(request: Request):
     """
     Ingest a list of log records.
     Each record should contain at least: trace_id, span_id.
+    
+    The body is a JSON array, or a MessagePack array when sent with
+    Content-Type: application/msgpack (requires the "msgpack" extra).
+    Bodies sent with Content-Type: application/x-ndjson are streamed as
+    in /api/ingest/ndjson.
     """
-    count = ingest_records(db, records)
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith(NDJSON_CONTENT_TYPE):
+        return await ingest_ndjson(request)
+    
+    body = await request.body()
+    records = await asyncio.to_thread(_decode_ingest_body, body, content_type)
+    return {"ingested": await _write_records(records)}
+
+
+@app.post("/api/ingest/ndjson")
+async def ingest_ndjson(request: Request):
+    """
+    Ingest newline-delimited JSON log records (one object per line).
+    
+    The body is parsed while it streams in and written in batches of
+    _INSERT_BATCH_ROWS records, so memory use does not grow with the body.
+    An invalid line aborts the request with 422; batches before it are kept.
+    """
+    count = 0
+    batch: List[Dict[str, Any]] = []
+    tail = b""
+    lineno = 0
+    
+    def parse(line: bytes) -> Dict[str, Any]:
+        try:
+            record = _json_loads(line)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f"Invalid JSON on line {lineno}: {e}")
+        if not isinstance(record, dict):
+            raise HTTPException(status_code=422, detail=f"Line {lineno} is not a log record object")
+        return record
+    
+    async for chunk in request.stream():
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            lineno += 1
+            if line.strip():
+                batch.append(parse(line))
+            if len(batch) >= _INSERT_BATCH_ROWS:
+                count += await _write_records(batch)
+                batch = []
+    
+    lineno += 1
+    if tail.strip():
+        batch.append(parse(tail))
+    if batch:
+        count += await _write_records(batch)
     return {"ingested": count}
 
 
 @app.get("/api/traces")
 async def list_traces(limit: int = Query(100, ge=1, le=1000)):
     """List recent traces."""
-    cur = db.execute(
-        """
-        SELECT trace_id, MIN(ts) AS start_ts, MAX(ts) AS end_ts, COUNT(*) AS events
-        FROM logs
-        GROUP BY trace_id
-        ORDER BY MAX(ts) DESC
-        LIMIT ?
-        """,
-        (limit,),
-    )
-    rows = [dict(r) for r in cur.fetchall()]
-    return {"traces": rows}
+    return {"traces": await asyncio.to_thread(_list_traces, limit)}
+
+
+def _list_traces(limit: int) -> List[Dict[str, Any]]:
+    """Read the most recently active trace summaries (worker thread)."""
+    with pool_conn() as conn:
+        cur = conn.execute(
+            "SELECT trace_id, start_ts, end_ts, events FROM traces ORDER BY end_ts DESC LIMIT ?",
+            (limit,),
+        )
+        return [dict(r) for r in cur.fetchall()]
 
 
 @app.get("/api/trace/{trace_id}")
 async def get_trace(trace_id: str):
     """Get a specific trace with all its spans and logs."""
-    tree = fetch_trace(db, trace_id)
+    return await asyncio.to_thread(_get_trace, trace_id)
+
+
+def _get_trace(trace_id: str) -> Response:
+    """Build (or serve from cache) the /api/trace response (worker thread)."""
+    with pool_conn() as conn:
+        # The trace's summary row fingerprints it; a match serves the cached body
+        summary = conn.execute(
+            "SELECT events, end_ts FROM traces WHERE trace_id = ?", (trace_id,)
+        ).fetchone()
+        if summary is None:
+            raise HTTPException(status_code=404, detail="Trace not found")
+        events, max_ts = summary
+        body = _cached_trace(trace_id, events, max_ts)
+        if body is not None:
+            return Response(content=body, media_type="application/json")
+        tree = fetch_trace(conn, trace_id)
     if not tree:
         raise HTTPException(status_code=404, detail="Trace not found")
     
@@ -274,19 +873,50 @@ async def get_trace(trace_id: str):
         "title_for_span": tree["title_for_span"],
         "logs_by_span": {
             sid: [
-                {
-                    "ts": r["ts"],
-                    "level": r["level"],
-                    "logger": r["logger"],
-                    "event": r["event"],
-                    "attrs": json.loads(r["attrs"] or "{}"),
-                }
-                for r in recs
+                {"ts": ts, "level": level, "logger": logger, "event": event, "attrs": _raw_attrs(attrs)}
+                for ts, level, logger, event, attrs in zip(
+                    cols["ts"], cols["level"], cols["logger"], cols["event"], cols["attrs"]
+                )
             ]
-            for sid, recs in tree["logs_by_span"].items()
+            for sid, cols in tree["logs_by_span"].items()
         },
     }
-    return JSONResponse(payload)
+    response = FastJSONResponse(payload)
+    _cache_trace(trace_id, events, max_ts, response.body)
+    return response
+
+
+# Columns returned by /api/search (internal columns such as ts_us are left out)
+_SEARCH_COLUMNS = (
+    "id", "ts", "level", "logger", "event", "attrs", "trace_id", "span_id", "parent_span_id",
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _search_sql(level: bool, event: Optional[str], since: Optional[str], until: Optional[str]) -> str:
+    """Build the search query for one combination of present filters.
+    
+    event is None (no filter), "like" (substring scan) or "fts" (trigram
+    index lookup); since/until name the column the bound is compared with
+    ("ts_us" for parsed timestamps, "ts" otherwise) or are None. Each variant
+    is built once and always yields the identical string, so sqlite3's
+    per-connection statement cache reuses the prepared statement.
+    
+    Results are ordered on ts_us so idx_logs_ts_us serves the ORDER BY
+    (and ts_us bounds); rows whose ts does not parse come last.
+    """
+    sql = f"SELECT {', '.join(_SEARCH_COLUMNS)} FROM logs WHERE 1=1"
+    if level:
+        sql += " AND level = ?"
+    if event == "fts":
+        sql += " AND id IN (SELECT rowid FROM logs_fts WHERE logs_fts MATCH ?)"
+    elif event == "like":
+        sql += " AND event LIKE ?"
+    if since:
+        sql += f" AND {since} >= ?"
+    if until:
+        sql += f" AND {until} <= ?"
+    return sql + " ORDER BY ts_us DESC, id DESC LIMIT ?"
 
 
 @app.get("/api/search")
@@ -298,38 +928,44 @@ async def search_logs(
     limit: int = Query(100, ge=1, le=1000),
 ):
     """Search logs with filters."""
-    sql = "SELECT * FROM logs WHERE 1=1"
     args = []
-    
+    event_mode = None
     if level:
-        sql += " AND level = ?"
         args.append(level)
-    
     if event:
-        sql += " AND event LIKE ?"
-        args.append(f"%{event}%")
-    
+        # Trigrams need at least 3 characters; shorter terms scan with LIKE
+        if FTS_ENABLED and len(event) >= 3:
+            event_mode = "fts"
+            args.append('"' + event.replace('"', '""') + '"')
+        else:
+            event_mode = "like"
+            args.append(f"%{event}%")
+    # Bounds that parse as ISO timestamps compare as integers on ts_us;
+    # anything else keeps the plain string comparison on ts
+    since_col = until_col = None
     if since:
-        sql += " AND ts >= ?"
-        args.append(since)
-    
+        since_us = _ts_to_us(since)
+        since_col = "ts" if since_us is None else "ts_us"
+        args.append(since if since_us is None else since_us)
     if until:
-        sql += " AND ts <= ?"
-        args.append(until)
-    
-    sql += " ORDER BY ts DESC LIMIT ?"
+        until_us = _ts_to_us(until)
+        until_col = "ts" if until_us is None else "ts_us"
+        args.append(until if until_us is None else until_us)
     args.append(limit)
+    sql = _search_sql(bool(level), event_mode, since_col, until_col)
+    return await asyncio.to_thread(_search_logs, sql, args)
+
+
+def _search_logs(sql: str, args: List[Any]) -> Response:
+    """Run a search query and render its response (worker thread)."""
+    with pool_conn() as conn:
+        rows = [dict(r) for r in conn.execute(sql, args).fetchall()]
     
-    rows = [dict(r) for r in db.execute(sql, args).fetchall()]
-    
-    # Parse attrs back to JSON
     for row in rows:
-        try:
-            row["attrs"] = json.loads(row["attrs"] or "{}")
-        except Exception:
-            row["attrs"] = {}
+        row["attrs"] = _raw_attrs(row["attrs"])
     
-    return {"count": len(rows), "results": rows}
+    # Returned as a response object: attrs fragments must bypass jsonable_encoder
+    return FastJSONResponse({"count": len(rows), "results": rows})
 
 
 def main():
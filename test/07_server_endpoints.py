@@ -0,0 +1,226 @@
+"""Test the server ingest and search endpoints against a live server.
+
+Starts `python -m aitrace` on a temporary database and checks:
+- JSON, NDJSON and MessagePack bodies on /api/ingest
+- integers wider than 64 bits survive ingestion
+- /api/search event (full-text) and timestamp filters
+- /api/trace/{trace_id} returns every ingested record
+
+Run with:
+    uv run python test/07_server_endpoints.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+try:
+    import ormsgpack
+except ImportError:
+    ormsgpack = None
+
+PORT = int(os.environ.get("AITRACE_TEST_PORT", 8765))
+BASE_URL = f"http://127.0.0.1:{PORT}"
+TRACE_ID = "7" * 32
+
+
+def record(i: int, event: str, ts: str, **attrs) -> dict:
+    """Build a log record in the __tracer_meta__ format."""
+    return {
+        "__tracer_meta__": {
+            "timestamp": ts,
+            "level": "info",
+            "logger": "endpoint-test",
+            "event": event,
+            "trace_id": TRACE_ID,
+            "span_id": f"{i:016x}",
+        },
+        "i": i,
+        **attrs,
+    }
+
+
+def request(path: str, body: bytes = None, content_type: str = "application/json"):
+    """Send a request to the test server and return (status, decoded JSON)."""
+    headers = {"Content-Type": content_type} if body is not None else {}
+    req = urllib.request.Request(BASE_URL + path, data=body, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def start_server(home: str) -> subprocess.Popen:
+    """Start the server on a temporary database and wait until it answers."""
+    try:
+        urllib.request.urlopen(BASE_URL + "/api/traces", timeout=1)
+    except OSError:
+        pass
+    else:
+        raise RuntimeError(f"Port {PORT} is already in use, set AITRACE_TEST_PORT")
+    
+    server = subprocess.Popen(
+        [sys.executable, "-m", "aitrace", "--port", str(PORT), "--db-path", f"{home}/traces.db"],
+        env=dict(os.environ, HOME=home),
+        cwd=str(Path(__file__).parent.parent),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    for _ in range(100):
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            urllib.request.urlopen(BASE_URL + "/api/traces", timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError(f"Server did not start on port {PORT}")
+
+
+def test_json_ingest():
+    """Test 1: JSON array body."""
+    print("\n" + "=" * 60)
+    print("Test 1: JSON ingest")
+    print("=" * 60)
+    
+    records = [record(i, "json_event", f"2025-01-01T00:00:0{i}Z") for i in range(3)]
+    status, result = request("/api/ingest", json.dumps(records).encode())
+    assert status == 200 and result == {"ingested": 3}, (status, result)
+    
+    status, result = request("/api/ingest", b"{not json")
+    assert status == 422, (status, result)
+    print("✓ JSON array ingested, invalid body rejected with 422")
+
+
+def test_ndjson_ingest():
+    """Test 2: NDJSON body on both endpoints."""
+    print("\n" + "=" * 60)
+    print("Test 2: NDJSON ingest")
+    print("=" * 60)
+    
+    lines = [record(i, "ndjson_event", f"2025-01-01T00:01:0{i}Z") for i in range(3, 6)]
+    body = b"".join(json.dumps(r).encode() + b"\n" for r in lines)
+    status, result = request("/api/ingest/ndjson", body, "application/x-ndjson")
+    assert status == 200 and result == {"ingested": 3}, (status, result)
+    
+    # Same body through /api/ingest, selected by Content-Type (no trailing newline)
+    more = [record(6, "ndjson_event", "2025-01-01T00:01:06Z")]
+    status, result = request("/api/ingest", json.dumps(more[0]).encode(), "application/x-ndjson")
+    assert status == 200 and result == {"ingested": 1}, (status, result)
+    
+    status, result = request("/api/ingest/ndjson", b'{"ok": 1}\n[1, 2]\n', "application/x-ndjson")
+    assert status == 422 and "line 2" in result["detail"].lower(), (status, result)
+    print("✓ NDJSON ingested on both endpoints, bad line reported by number")
+
+
+def test_msgpack_ingest():
+    """Test 3: MessagePack body (needs the "msgpack" extra)."""
+    print("\n" + "=" * 60)
+    print("Test 3: MessagePack ingest")
+    print("=" * 60)
+    
+    if ormsgpack is None:
+        print("- ormsgpack not installed, skipped")
+        return
+    
+    records = [record(7, "msgpack_event", "2025-01-01T00:02:00Z")]
+    status, result = request("/api/ingest", ormsgpack.packb(records), "application/msgpack")
+    assert status == 200 and result == {"ingested": 1}, (status, result)
+    print("✓ MessagePack array ingested")
+
+
+def test_big_int():
+    """Test 4: Integers wider than 64 bits keep their exact value."""
+    print("\n" + "=" * 60)
+    print("Test 4: Big integer attribute")
+    print("=" * 60)
+    
+    big = 2 ** 70 + 1
+    records = [record(8, "big_int_event", "2025-01-01T00:03:00Z", big=big)]
+    status, result = request("/api/ingest", json.dumps(records).encode())
+    assert status == 200, (status, result)
+    
+    status, result = request("/api/search?event=big_int_event")
+    assert result["count"] == 1, result
+    assert result["results"][0]["attrs"]["big"] == big, result["results"][0]["attrs"]
+    print(f"✓ {big} stored exactly")
+
+
+def test_search():
+    """Test 5: Event and timestamp filters on /api/search."""
+    print("\n" + "=" * 60)
+    print("Test 5: Search")
+    print("=" * 60)
+    
+    # Full-text (3+ characters) and LIKE (shorter) event matching
+    status, result = request("/api/search?event=ndjson")
+    assert status == 200 and result["count"] == 4, result
+    status, result = request("/api/search?event=js")
+    assert result["count"] == 7, result
+    
+    # Timestamp bounds, newest first
+    status, result = request(
+        "/api/search?since=2025-01-01T00:01:00Z&until=2025-01-01T00:01:59Z"
+    )
+    events = [(r["event"], r["ts"]) for r in result["results"]]
+    assert [ts for _, ts in events] == sorted((ts for _, ts in events), reverse=True), events
+    assert {event for event, _ in events} == {"ndjson_event"} and len(events) == 4, events
+    
+    # Internal columns are not part of the response
+    assert "ts_us" not in result["results"][0], result["results"][0].keys()
+    print(f"✓ Event and time filters matched, columns: {sorted(result['results'][0])}")
+
+
+def test_trace():
+    """Test 6: The trace lists every ingested record."""
+    print("\n" + "=" * 60)
+    print("Test 6: Trace fetch")
+    print("=" * 60)
+    
+    status, result = request(f"/api/trace/{TRACE_ID}")
+    assert status == 200, (status, result)
+    count = sum(len(logs) for logs in result["logs_by_span"].values())
+    expected = 9 if ormsgpack is not None else 8
+    assert count == expected, (count, expected)
+    
+    status, result = request("/api/trace/" + "0" * 32)
+    assert status == 404, (status, result)
+    print(f"✓ Trace has {count} logs, unknown trace returns 404")
+
+
+def main():
+    """Run all endpoint tests against a temporary server."""
+    print("\n" + "=" * 70)
+    print(" Server Endpoints Test Suite")
+    print("=" * 70)
+    
+    with tempfile.TemporaryDirectory() as home:
+        server = start_server(home)
+        try:
+            test_json_ingest()
+            test_ndjson_ingest()
+            test_msgpack_ingest()
+            test_big_int()
+            test_search()
+            test_trace()
+        finally:
+            server.terminate()
+            server.wait()
+    
+    print("=" * 70)
+    print(" All tests completed!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Test BufferedLogger overflow policies, stats() and the HTTP fallback.
+
+Checks:
+- a full buffer drops the oldest (default) or the newest entries
+- stats() counts writes, drops, retries and buffered entries
+- an unreachable server is retried, then the batch is saved as HTML
+- HTML fallbacks written within the same second get distinct names
+- get_logs() snapshots survive the interval timer's flushes
+- a failed flush puts its batch back by the overflow policy, counting drops
+- concurrent flushes write whole lines, in buffer order
+
+Run with:
+    uv run python test/08_buffer_overflow_fallback.py
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Fallback HTML goes to ~/tmp/temp-trace/, so point HOME at a scratch
+# directory before aitrace resolves it on import
+_home = tempfile.TemporaryDirectory()
+os.environ["HOME"] = _home.name
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from aitrace import BufferedLogger
+
+FALLBACK_DIR = Path(_home.name) / "tmp" / "temp-trace"
+
+
+def event_ids(buffered: BufferedLogger) -> list:
+    """Return the `i` attribute of every buffered entry, oldest first."""
+    return [entry["i"] for entry in buffered.get_logs()]
+
+
+def unused_port() -> int:
+    """Return a local port nothing is listening on."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_drop_oldest():
+    """Test 1: Default policy keeps the newest entries."""
+    print("\n" + "=" * 60)
+    print("Test 1: Overflow drop_oldest")
+    print("=" * 60)
+    
+    buffered = BufferedLogger(target="-", capacity=5, max_batch=0, max_interval_ms=0)
+    for i in range(8):
+        buffered.logger.info("overflow_event", i=i)
+    
+    assert event_ids(buffered) == [3, 4, 5, 6, 7], event_ids(buffered)
+    stats = buffered.stats()
+    assert stats == {"writes": 8, "drops": 3, "retries": 0, "buffered": 5}, stats
+    buffered.clear()
+    print(f"✓ Oldest entries dropped, stats: {stats}")
+
+
+def test_drop_newest():
+    """Test 2: drop_newest keeps the entries already buffered."""
+    print("\n" + "=" * 60)
+    print("Test 2: Overflow drop_newest")
+    print("=" * 60)
+    
+    buffered = BufferedLogger(
+        target="-", capacity=5, overflow="drop_newest", max_batch=0, max_interval_ms=0
+    )
+    for i in range(8):
+        buffered.logger.info("overflow_event", i=i)
+    
+    assert event_ids(buffered) == [0, 1, 2, 3, 4], event_ids(buffered)
+    stats = buffered.stats()
+    assert stats["drops"] == 3 and stats["buffered"] == 5, stats
+    buffered.clear()
+    
+    try:
+        BufferedLogger(target="-", overflow="block")
+    except ValueError as e:
+        print(f"✓ Newest entries dropped, unknown policy rejected: {e}")
+    else:
+        raise AssertionError("overflow='block' was accepted")
+
+
+def test_http_fallback():
+    """Test 3: Unreachable server is retried, then saved as HTML."""
+    print("\n" + "=" * 60)
+    print("Test 3: HTTP retry and HTML fallback")
+    print("=" * 60)
+    
+    os.environ["AITRACE_HTTP_RETRIES"] = "2"
+    os.environ["AITRACE_HTTP_BACKOFF_MS"] = "1"
+    try:
+        buffered = BufferedLogger(
+            target=f"http://127.0.0.1:{unused_port()}/api/ingest",
+            max_batch=0,
+            max_interval_ms=0,
+        )
+    finally:
+        del os.environ["AITRACE_HTTP_RETRIES"]
+        del os.environ["AITRACE_HTTP_BACKOFF_MS"]
+    
+    for i in range(3):
+        buffered.logger.info("fallback_event", i=i)
+    result = buffered.flush()
+    assert result["queued"], result
+    
+    # close() waits for the sender thread to give up and write the HTML
+    buffered.close()
+    stats = buffered.stats()
+    assert stats["retries"] == 2 and stats["buffered"] == 0, stats
+    
+    files = list(FALLBACK_DIR.glob("*.html"))
+    assert len(files) == 1, files
+    html = files[0].read_text()
+    assert html.count("fallback_event") >= 3, "events missing from fallback HTML"
+    files[0].unlink()
+    print(f"✓ Retried {stats['retries']} times, saved {files[0].name}")
+
+
+def test_fallback_names():
+    """Test 4: Fallbacks within one second don't overwrite each other."""
+    print("\n" + "=" * 60)
+    print("Test 4: Unique HTML fallback names")
+    print("=" * 60)
+    
+    buffered = BufferedLogger(target="-", max_batch=0, max_interval_ms=0)
+    buffered.logger.info("name_event", i=0)
+    entries = buffered.get_logs(copy=True)
+    buffered.clear()
+    
+    paths = [buffered._export_to_html_fallback(entries) for _ in range(3)]
+    names = sorted(path.name for path in paths)
+    assert len(set(names)) == 3, names
+    assert all(path.exists() for path in paths), paths
+    print(f"✓ Distinct files: {', '.join(names)}")
+
+
+def test_get_logs_during_timer_flush():
+    """Test 5: get_logs() while the interval timer flushes."""
+    print("\n" + "=" * 60)
+    print("Test 5: get_logs() and the flush timer")
+    print("=" * 60)
+    
+    target = str(Path(_home.name) / "timer.jsonl")
+    buffered = BufferedLogger(target=target, max_batch=0, max_interval_ms=50)
+    for i in range(10):
+        buffered.logger.info("timer_event", i=i)
+    logs = buffered.get_logs()
+    time.sleep(0.2)
+    assert len(logs) == 10 and buffered.stats()["buffered"] == 0, len(logs)
+    
+    # Iterating the live view must not trip over the timer emptying the deque
+    buffered = BufferedLogger(target=target, max_batch=0, max_interval_ms=1)
+    for _ in range(50):
+        for i in range(200):
+            buffered.logger.info("timer_event", i=i)
+        view = buffered.get_logs(copy=False)
+        for _ in view:
+            pass
+    buffered.close()
+    print("✓ Snapshot kept all entries, live view iterated safely")
+
+
+def test_requeue_on_full_buffer():
+    """Test 6: A failed flush puts its batch back by the overflow policy."""
+    print("\n" + "=" * 60)
+    print("Test 6: Requeue after a failed flush")
+    print("=" * 60)
+    
+    for overflow, expected in (("drop_oldest", [2, 3, 4, 5, 6, 7]), ("drop_newest", [0, 1, 2, 3, 4, 5])):
+        buffered = BufferedLogger(
+            target=_home.name, capacity=6, overflow=overflow, max_batch=0, max_interval_ms=0
+        )
+        for i in range(4):
+            buffered.logger.info("requeue_event", i=i)
+        
+        def failing_write(entries, buffered=buffered):
+            # More entries arrive while the batch is out, then the write fails
+            for i in range(4, 8):
+                buffered.logger.info("requeue_event", i=i)
+            raise OSError("disk full")
+        
+        buffered._write_batch = failing_write
+        try:
+            buffered.flush()
+        except OSError:
+            pass
+        else:
+            raise AssertionError("flush() did not raise")
+        
+        assert event_ids(buffered) == expected, (overflow, event_ids(buffered))
+        stats = buffered.stats()
+        assert stats["drops"] == 2 and stats["buffered"] == 6, (overflow, stats)
+        buffered.clear()
+        print(f"✓ {overflow}: kept {expected}, {stats['drops']} drops counted")
+
+
+def test_concurrent_flush_order():
+    """Test 7: Timer and caller flushes keep the file in buffer order."""
+    print("\n" + "=" * 60)
+    print("Test 7: Concurrent flush order")
+    print("=" * 60)
+    
+    target = Path(_home.name) / "order.jsonl"
+    buffered = BufferedLogger(target=str(target), max_batch=0, max_interval_ms=1)
+    counter = iter(range(1_000_000))
+    counter_lock = threading.Lock()
+    
+    def worker():
+        for _ in range(2000):
+            with counter_lock:
+                buffered.logger.info("order_event", i=next(counter))
+            buffered.flush()
+    
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    buffered.close()
+    
+    ids = [json.loads(line)["i"] for line in target.read_text().splitlines()]
+    assert ids == list(range(8000)), "batches were written out of order"
+    print(f"✓ {len(ids)} entries written in order")
+
+
+# Writes large batches to stdout from several threads at once, as the
+# background writer and a caller writing directly (e.g. when the writer queue
+# is full) can. Nothing is logged, so structlog's own stdout output stays out.
+_STDOUT_WRITER = """
+import sys, threading
+sys.path.insert(0, sys.argv[1])
+from aitrace import BufferedLogger
+buffered = BufferedLogger(target="-", max_batch=0, max_interval_ms=0)
+def worker(n):
+    entries = [{"n": n, "i": i, "payload": "x" * 20000} for i in range(20)]
+    for _ in range(20):
+        buffered._write_batch(entries)
+threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+"""
+
+
+def test_concurrent_stdout_flush():
+    """Test 8: Concurrent stdout flushes into a pipe write whole lines."""
+    print("\n" + "=" * 60)
+    print("Test 8: Concurrent stdout flushes")
+    print("=" * 60)
+    
+    result = subprocess.run(
+        [sys.executable, "-c", _STDOUT_WRITER, str(Path(__file__).parent.parent)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    lines = result.stdout.splitlines()
+    assert len(lines) == 4 * 20 * 20, len(lines)
+    for line in lines:
+        entry = json.loads(line)
+        assert len(entry["payload"]) == 20000, "torn line"
+    print(f"✓ {len(lines)} lines, all valid JSON")
+
+
+def main():
+    """Run all overflow and fallback tests."""
+    print("\n" + "=" * 70)
+    print(" BufferedLogger Overflow and Fallback Test Suite")
+    print("=" * 70)
+    
+    try:
+        test_drop_oldest()
+        test_drop_newest()
+        test_http_fallback()
+        test_fallback_names()
+        test_get_logs_during_timer_flush()
+        test_requeue_on_full_buffer()
+        test_concurrent_flush_order()
+        test_concurrent_stdout_flush()
+    finally:
+        _home.cleanup()
+    
+    print("=" * 70)
+    print(" All tests completed!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()